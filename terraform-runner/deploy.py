@@ -3,18 +3,68 @@ import logging
 import time
 import json
 import subprocess
-import boto3
+import ijson
+try:
+    import orjson
+except ImportError:  # stdlib json exposes the same loads()
+    import json as orjson
 import zipfile
 import tempfile
+import contextlib
+import functools
 import gc  # Add garbage collection
-import requests  # Add requests for HTTP calls to main backend
-from python_terraform import Terraform
+import hashlib
+import shutil
+import signal
+import threading
+try:
+    import fcntl
+except ImportError:  # Windows: only the in-process lock applies
+    fcntl = None
+from collections import OrderedDict, deque
+from dataclasses import dataclass
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
+from botocore.config import Config
 from botocore.exceptions import ClientError
 
 
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+WORKSPACE_ROOT = os.path.join(SCRIPT_DIR, "workspace")
+STATE_FILE_NAME = "terraform.tfstate"
+
 # ✅ Load .env variables into os.environ
-load_dotenv(os.path.join(os.path.dirname(__file__), "..", ".env"))
+load_dotenv(os.path.join(SCRIPT_DIR, "..", ".env"))
+
+@dataclass(frozen=True, slots=True)
+class AwsConfig:
+    """AWS settings read from the environment once instead of on every request"""
+    access_key: str | None
+    secret_key: str | None
+    session_token: str | None
+    region: str
+    sts_region: str
+    role_arn: str | None
+    external_id: str | None
+    node_env: str
+    # Must not exceed the target role's MaxSessionDuration (1h by default, up to 12h)
+    sts_duration_seconds: int
+    sts_cache_dir: str
+
+    @classmethod
+    def from_env(cls):
+        return cls(
+            access_key=os.getenv('AWS_ACCESS_KEY_ID'),
+            secret_key=os.getenv('AWS_SECRET_ACCESS_KEY'),
+            session_token=os.getenv('AWS_SESSION_TOKEN'),
+            region=os.getenv('AWS_DEFAULT_REGION', os.getenv('AWS_REGION', 'us-east-1')),
+            sts_region=os.getenv('AWS_REGION', 'us-east-1'),
+            role_arn=os.getenv('AWS_ROLE_ARN'),
+            external_id=os.getenv('AWS_EXTERNAL_ID'),
+            node_env=os.getenv('NODE_ENV', 'development'),
+            sts_duration_seconds=int(os.getenv('AWS_STS_DURATION_SECONDS', '43200')),
+            sts_cache_dir=os.getenv('STS_CACHE_DIR', os.path.expanduser(os.path.join('~', '.cache', 'chart-app')))
+        )
 
 # Setup logging with memory-efficient configuration
 logging.basicConfig(
@@ -25,45 +75,242 @@ logging.basicConfig(
     ]
 )
 logger = logging.getLogger(__name__)
+# No format string here uses thread or process fields; skip looking them up per record
+logging.logThreads = False
+logging.logProcesses = False
+logging.logMultiprocessing = False
 
 # Memory optimization: Limit log retention - safely check for handlers
 if logger.handlers:
     logger.handlers[0].setLevel(logging.INFO)
 
+# Resolve the bundled terraform binary once at import. Its directory is prepended to
+# the PATH of a precomputed base environment that every terraform run starts from,
+# rather than mutating os.environ on each request.
+TERRAFORM_BIN_DIR = os.path.normpath(os.path.join(SCRIPT_DIR, "..", "bin"))
+TERRAFORM_BASE_ENV = dict(os.environ)
+if os.path.isfile(os.path.join(TERRAFORM_BIN_DIR, "terraform")):
+    logger.info(f"Found Terraform binary in: {TERRAFORM_BIN_DIR}")
+    if TERRAFORM_BIN_DIR not in TERRAFORM_BASE_ENV.get('PATH', '').split(os.pathsep):
+        TERRAFORM_BASE_ENV['PATH'] = TERRAFORM_BIN_DIR + os.pathsep + TERRAFORM_BASE_ENV.get('PATH', '')
+else:
+    logger.warning(f"Terraform binary not found in: {TERRAFORM_BIN_DIR}, falling back to system PATH")
+
+@functools.lru_cache(maxsize=1)
+def _terraform_version():
+    """Log `terraform version` on first use; the binary does not change while the service runs"""
+    try:
+        result = subprocess.run(["terraform", "version"], capture_output=True, text=True, timeout=5, env=TERRAFORM_BASE_ENV)
+        logger.info(f"[DEPLOY] Terraform version check: {result.stdout}")
+        if result.returncode != 0:
+            logger.error(f"[DEPLOY] Terraform version check failed: {result.stderr}")
+        return result.stdout
+    except Exception as e:
+        logger.error(f"[DEPLOY] Terraform binary test failed: {e}")
+        return ""
+
+@functools.lru_cache(maxsize=None)
+def _boto3():
+    """Import boto3 on first use so code paths that never call AWS skip its import cost"""
+    import boto3
+    return boto3
+
+STS_CLIENT_CONFIG = Config(
+    max_pool_connections=32,
+    tcp_keepalive=True,
+    retries={'mode': 'adaptive', 'max_attempts': 3}
+)
+
+CREDENTIAL_REFRESH_LEAD_SECONDS = 60  # refresh this long before the cached expiration
+STS_FALLBACK_DURATION_SECONDS = 3600  # session length every role accepts
+
 class AWSCredentialManager:
     """Python implementation of the STS assume role credential manager"""
     
-    def __init__(self):
+    def __init__(self, cfg=None):
+        self.cfg = cfg or AwsConfig.from_env()
+        # Lowered to STS_FALLBACK_DURATION_SECONDS once STS rejects the configured duration
+        self._sts_duration_seconds = self.cfg.sts_duration_seconds
         self.cached_credentials = {}
         self.sts_client = None
+        # Guards cached_credentials, _inflight and sts_client across request threads
+        self._lock = threading.RLock()
+        # cache_key -> Event set once the thread assuming that role has finished
+        self._inflight = {}
+        # cache_key -> Timer that refreshes those credentials ahead of expiry
+        self._refresh_timers = {}
+        self._load_disk_cache()
+    
+    def reload(self):
+        """Re-read AwsConfig from the environment and drop clients/credentials built from the old one"""
+        self.shutdown()
+        with self._lock:
+            self._purge_disk_cache()
+            self.cfg = AwsConfig.from_env()
+            self._sts_duration_seconds = self.cfg.sts_duration_seconds
+            self.cached_credentials.clear()
+            self.sts_client = None
+    
+    def shutdown(self):
+        """Cancel all pending background credential refreshes"""
+        with self._lock:
+            timers = list(self._refresh_timers.values())
+            self._refresh_timers.clear()
+        for timer in timers:
+            timer.cancel()
         
     def _get_sts_client(self):
         """Initialize STS client if not already done"""
         if self.sts_client is None:
-            # Use default credentials (from environment) to create STS client
-            self.sts_client = boto3.client('sts', region_name=os.getenv('AWS_REGION', 'us-east-1'))
+            with self._lock:
+                if self.sts_client is None:
+                    # Use default credentials (from environment) to create STS client.
+                    # The regional endpoint avoids the extra hop to global sts.amazonaws.com.
+                    region = self.cfg.sts_region
+                    self.sts_client = _boto3().client(
+                        'sts',
+                        region_name=region,
+                        endpoint_url=f"https://sts.{region}.amazonaws.com",
+                        config=STS_CLIENT_CONFIG
+                    )
         return self.sts_client
     
     def get_credentials_for_user(self, user_id, project_id):
         """Get temporary credentials for a specific user/project using STS assume role"""
         cache_key = f"{user_id}-{project_id}"
         
-        # Check cache first (with expiration)
-        if cache_key in self.cached_credentials:
-            cached = self.cached_credentials[cache_key]
-            if cached['expiration'] > time.time():
-                logger.info(f"[AWS] Using cached credentials for user {user_id}, project {project_id}")
-                return cached['credentials']
-            else:
-                # Remove expired credentials
-                del self.cached_credentials[cache_key]
+        while True:
+            with self._lock:
+                # Check cache first (with expiration)
+                cached = self.cached_credentials.get(cache_key)
+                if cached is not None:
+                    if cached['expiration'] > time.time():
+                        logger.info(f"[AWS] Using cached credentials for user {user_id}, project {project_id}")
+                        cached['used'] = True
+                        return cached['credentials']
+                    # Remove expired credentials
+                    del self.cached_credentials[cache_key]
+                
+                event = self._inflight.get(cache_key)
+                if event is None:
+                    # This thread makes the STS call; concurrent callers wait on the event
+                    event = self._inflight[cache_key] = threading.Event()
+                    break
+            
+            # Another thread is assuming this role already; re-read the cache when it is done
+            event.wait(timeout=30)
         
+        try:
+            return self._assume_role(user_id, project_id, cache_key)
+        finally:
+            with self._lock:
+                self._inflight.pop(cache_key, None)
+            event.set()
+    
+    def _disk_cache_path(self, cache_key):
+        # Hashed so user and project IDs do not show up in file names. The role is part of
+        # the key, so credentials for a previously configured role are never looked up.
+        identity = "\0".join((self.cfg.role_arn or "", self.cfg.external_id or "", cache_key))
+        digest = hashlib.sha256(identity.encode()).hexdigest()
+        return os.path.join(self.cfg.sts_cache_dir, f"sts-{digest}.json")
+    
+    def _disk_cache_entries(self):
+        try:
+            entries = list(os.scandir(self.cfg.sts_cache_dir))
+        except FileNotFoundError:
+            return []
+        return [entry for entry in entries if entry.name.startswith("sts-") and entry.name.endswith(".json")]
+    
+    def _purge_disk_cache(self):
+        """Delete every persisted credential set, e.g. before switching to a different role"""
+        for entry in self._disk_cache_entries():
+            try:
+                os.remove(entry.path)
+            except OSError as e:
+                logger.warning(f"[AWS] Could not remove credential cache file {entry.path}: {e}")
+    
+    def _load_disk_cache(self):
+        """Load still-valid credentials persisted by an earlier process, removing expired ones"""
+        now = time.time()
+        for entry in self._disk_cache_entries():
+            try:
+                with open(entry.path, 'r') as f:
+                    cached = json.load(f)
+                # Entries issued for another role (or external id) must not be handed out
+                if (cached['expiration'] <= now
+                        or cached.get('role_arn') != self.cfg.role_arn
+                        or cached.get('external_id') != self.cfg.external_id):
+                    os.remove(entry.path)
+                    continue
+                self.cached_credentials[cached['cache_key']] = {
+                    'credentials': cached['credentials'],
+                    'expiration': cached['expiration'],
+                    'used': False
+                }
+            except Exception as e:
+                logger.warning(f"[AWS] Ignoring unreadable credential cache file {entry.path}: {e}")
+        if self.cached_credentials:
+            logger.info(f"[AWS] Loaded {len(self.cached_credentials)} cached credential sets from disk")
+    
+    def _save_disk_cache(self, cache_key, credentials, expiration_time):
+        """Persist credentials (owner read/write only) so a restart does not re-assume the role"""
+        path = self._disk_cache_path(cache_key)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        try:
+            os.makedirs(self.cfg.sts_cache_dir, mode=0o700, exist_ok=True)
+            fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+            with os.fdopen(fd, 'w') as f:
+                json.dump({
+                    'cache_key': cache_key,
+                    'role_arn': self.cfg.role_arn,
+                    'external_id': self.cfg.external_id,
+                    'credentials': credentials,
+                    'expiration': expiration_time
+                }, f)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning(f"[AWS] Could not persist credential cache: {e}")
+    
+    def _schedule_refresh(self, user_id, project_id, cache_key, expiration_time):
+        """Re-assume the role in the background shortly before the cached credentials expire"""
+        delay = max(expiration_time - time.time() - CREDENTIAL_REFRESH_LEAD_SECONDS, 0)
+        timer = threading.Timer(delay, self._refresh_bg, args=(user_id, project_id, cache_key))
+        timer.daemon = True
+        with self._lock:
+            previous = self._refresh_timers.get(cache_key)
+            self._refresh_timers[cache_key] = timer
+        if previous is not None:
+            previous.cancel()
+        timer.start()
+    
+    def _refresh_bg(self, user_id, project_id, cache_key):
+        """Timer callback: refresh credentials that were used since they were last issued"""
+        with self._lock:
+            if self._refresh_timers.get(cache_key) is threading.current_thread():
+                del self._refresh_timers[cache_key]
+            cached = self.cached_credentials.get(cache_key)
+            # Idle keys are left to expire; the next request re-assumes in the foreground
+            if cached is None or not cached['used'] or cache_key in self._inflight:
+                return
+            event = self._inflight[cache_key] = threading.Event()
+        
+        try:
+            self._assume_role(user_id, project_id, cache_key, used=False)
+        except Exception:
+            pass  # Already logged; the cached credentials stay valid until their expiration
+        finally:
+            with self._lock:
+                self._inflight.pop(cache_key, None)
+            event.set()
+    
+    def _assume_role(self, user_id, project_id, cache_key, used=True):
+        """Call STS AssumeRole for a user/project and cache the result under cache_key"""
         try:
             logger.info(f"[AWS] Assuming role for user {user_id}, project {project_id}")
             
             # Validate required environment variables
-            role_arn = os.getenv('AWS_ROLE_ARN')
-            external_id = os.getenv('AWS_EXTERNAL_ID')
+            role_arn = self.cfg.role_arn
+            external_id = self.cfg.external_id
             
             if not role_arn:
                 raise ValueError("AWS_ROLE_ARN environment variable is required for STS assume role")
@@ -73,19 +320,36 @@ class AWSCredentialManager:
             
             # Assume role with user-specific session
             sts_client = self._get_sts_client()
-            response = sts_client.assume_role(
+            assume_role_args = dict(
                 RoleArn=role_arn,
                 RoleSessionName=f"chart-app-{user_id}-{project_id}",
                 ExternalId=external_id,
-                DurationSeconds=3600,  # 1 hour
+                DurationSeconds=self._sts_duration_seconds,
                 Tags=[
                     {'Key': 'UserId', 'Value': user_id},
                     {'Key': 'ProjectId', 'Value': project_id},
                     {'Key': 'ManagedBy', 'Value': 'chart-app-platform'},
-                    {'Key': 'Environment', 'Value': os.getenv('NODE_ENV', 'development')},
-                    {'Key': 'CreatedAt', 'Value': time.strftime('%Y-%m-%dT%H:%M:%SZ')}
+                    {'Key': 'Environment', 'Value': self.cfg.node_env},
+                    {'Key': 'CreatedAt', 'Value': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime())}
                 ]
             )
+            try:
+                response = sts_client.assume_role(**assume_role_args)
+            except ClientError as e:
+                # Only retry shorter when STS objects to the duration itself; ValidationError
+                # also covers e.g. an over-long RoleSessionName or bad tag values
+                error = e.response.get('Error', {})
+                requested = assume_role_args['DurationSeconds']
+                if (error.get('Code') != 'ValidationError'
+                        or not any(word in error.get('Message', '') for word in ('DurationSeconds', 'MaxSessionDuration'))
+                        or requested <= STS_FALLBACK_DURATION_SECONDS):
+                    raise
+                logger.warning(
+                    f"[AWS] DurationSeconds={requested} rejected by STS, "
+                    f"falling back to {STS_FALLBACK_DURATION_SECONDS}s: {e}"
+                )
+                self._sts_duration_seconds = assume_role_args['DurationSeconds'] = STS_FALLBACK_DURATION_SECONDS
+                response = sts_client.assume_role(**assume_role_args)
             
             if 'Credentials' not in response:
                 raise ValueError("Failed to assume AWS role - no credentials returned")
@@ -99,10 +363,14 @@ class AWSCredentialManager:
             # Cache credentials (expire 10 minutes before actual expiration for safety)
             expiration_time = response['Credentials']['Expiration'].timestamp() - (10 * 60)
             
-            self.cached_credentials[cache_key] = {
-                'credentials': credentials,
-                'expiration': expiration_time
-            }
+            with self._lock:
+                self.cached_credentials[cache_key] = {
+                    'credentials': credentials,
+                    'expiration': expiration_time,
+                    'used': used
+                }
+            self._save_disk_cache(cache_key, credentials, expiration_time)
+            self._schedule_refresh(user_id, project_id, cache_key, expiration_time)
             
             logger.info(f"[AWS] Successfully assumed role for user {user_id}, expires at {time.ctime(expiration_time)}")
             return credentials
@@ -117,22 +385,23 @@ class AWSCredentialManager:
         Supports both direct credentials and IAM role assumption.
         """
         # Check if we should use direct credentials
-        has_direct_credentials = os.getenv('AWS_ACCESS_KEY_ID') and os.getenv('AWS_SECRET_ACCESS_KEY')
-        has_role_config = os.getenv('AWS_ROLE_ARN') and os.getenv('AWS_EXTERNAL_ID')
+        cfg = self.cfg
+        has_direct_credentials = cfg.access_key and cfg.secret_key
+        has_role_config = cfg.role_arn and cfg.external_id
         
         # Log the credential approach being used
         if has_direct_credentials and not has_role_config:
             logger.info("[AWS] Using direct AWS credentials (Access Key/Secret)")
             return {
-                'aws_access_key_id': os.getenv('AWS_ACCESS_KEY_ID'),
-                'aws_secret_access_key': os.getenv('AWS_SECRET_ACCESS_KEY'),
-                'aws_session_token': os.getenv('AWS_SESSION_TOKEN')  # Optional
+                'aws_access_key_id': cfg.access_key,
+                'aws_secret_access_key': cfg.secret_key,
+                'aws_session_token': cfg.session_token  # Optional
             }
         
         # If we have role configuration, use role assumption
         if has_role_config:
             if not user_id or not project_id:
-                if os.getenv('NODE_ENV') == 'production':
+                if cfg.node_env == 'production':
                     raise ValueError("user_id and project_id are required for IAM role assumption in production")
                 # In development, we can proceed without user context for testing
                 logger.info("[AWS] Warning: Using role assumption without user context (development only)")
@@ -143,7 +412,7 @@ class AWSCredentialManager:
         
         # If we have both, prefer role assumption in production
         if has_direct_credentials and has_role_config:
-            if os.getenv('NODE_ENV') == 'production':
+            if cfg.node_env == 'production':
                 logger.info("[AWS] Both credential types available, using IAM role assumption for production")
                 if not user_id or not project_id:
                     raise ValueError("user_id and project_id are required for IAM role assumption in production")
@@ -151,9 +420,9 @@ class AWSCredentialManager:
             else:
                 logger.info("[AWS] Both credential types available, using direct credentials for development")
                 return {
-                    'aws_access_key_id': os.getenv('AWS_ACCESS_KEY_ID'),
-                    'aws_secret_access_key': os.getenv('AWS_SECRET_ACCESS_KEY'),
-                    'aws_session_token': os.getenv('AWS_SESSION_TOKEN')
+                    'aws_access_key_id': cfg.access_key,
+                    'aws_secret_access_key': cfg.secret_key,
+                    'aws_session_token': cfg.session_token
                 }
         
         # No valid credentials found
@@ -349,12 +618,11 @@ def handler(event, context):
     
     logger.info(f"[DEPLOY] Created dummy Python {filename} ({os.path.getsize(zip_path)} bytes)")
 
-def import_existing_resources(project_id, terraform_config):
+def import_existing_resources(project_id, terraform_config, env=None):
     """Import existing AWS resources into Terraform state to avoid conflicts"""
     logger.info("[DEPLOY] Checking for existing AWS resources to import...")
     
-    workspace_dir = os.path.join(os.path.dirname(__file__), "workspace", project_id)
-    tf = Terraform(working_dir=workspace_dir)
+    workspace_dir = workspace_path(project_id)
     
     # Parse terraform config to find resource names
     import re
@@ -387,7 +655,7 @@ def import_existing_resources(project_id, terraform_config):
                 logger.info(f"[DEPLOY] Found existing S3 bucket: {bucket_name}")
                 
                 # Try to import
-                return_code, stdout, stderr = tf.import_cmd(f"aws_s3_bucket.{resource_name}", bucket_name)
+                return_code, stdout, stderr = run_terraform(workspace_dir, "import", "-input=false", "-no-color", f"aws_s3_bucket.{resource_name}", bucket_name, env=env)
                 if return_code == 0:
                     logger.info(f"[DEPLOY] Successfully imported S3 bucket: {bucket_name}")
                     import_results.append(f"Imported S3 bucket: {bucket_name}")
@@ -406,7 +674,7 @@ def import_existing_resources(project_id, terraform_config):
                 logger.info(f"[DEPLOY] Found existing IAM role: {role_name}")
                 
                 # Try to import
-                return_code, stdout, stderr = tf.import_cmd(f"aws_iam_role.{resource_name}", role_name)
+                return_code, stdout, stderr = run_terraform(workspace_dir, "import", "-input=false", "-no-color", f"aws_iam_role.{resource_name}", role_name, env=env)
                 if return_code == 0:
                     logger.info(f"[DEPLOY] Successfully imported IAM role: {role_name}")
                     import_results.append(f"Imported IAM role: {role_name}")
@@ -425,7 +693,7 @@ def import_existing_resources(project_id, terraform_config):
                 logger.info(f"[DEPLOY] Found existing DynamoDB table: {table_name}")
                 
                 # Try to import
-                return_code, stdout, stderr = tf.import_cmd(f"aws_dynamodb_table.{resource_name}", table_name)
+                return_code, stdout, stderr = run_terraform(workspace_dir, "import", "-input=false", "-no-color", f"aws_dynamodb_table.{resource_name}", table_name, env=env)
                 if return_code == 0:
                     logger.info(f"[DEPLOY] Successfully imported DynamoDB table: {table_name}")
                     import_results.append(f"Imported DynamoDB table: {table_name}")
@@ -444,7 +712,7 @@ def import_existing_resources(project_id, terraform_config):
                 logger.info(f"[DEPLOY] Found existing Lambda function: {function_name}")
                 
                 # Try to import
-                return_code, stdout, stderr = tf.import_cmd(f"aws_lambda_function.{resource_name}", function_name)
+                return_code, stdout, stderr = run_terraform(workspace_dir, "import", "-input=false", "-no-color", f"aws_lambda_function.{resource_name}", function_name, env=env)
                 if return_code == 0:
                     logger.info(f"[DEPLOY] Successfully imported Lambda function: {function_name}")
                     import_results.append(f"Imported Lambda function: {function_name}")
@@ -492,30 +760,182 @@ def cleanup_workspace_memory(workspace_dir):
     except Exception as e:
         logger.warning(f"[MEMORY] Cleanup warning: {e}")
 
-def deploy_terraform(project_id, user_id=None):
-    # Find terraform binary location
-    script_dir = os.path.dirname(__file__)
-    terraform_bin_path = os.path.join(script_dir, "..", "bin", "terraform")
+TERRAFORM_LOG_LINE_LIMIT = 1024  # characters kept per streamed output line
+TERRAFORM_OUTPUT_TAIL_LINES = 500  # lines kept per stream for the returned stdout/stderr
+TERRAFORM_READER_JOIN_TIMEOUT = 10  # seconds to keep draining output after terraform itself has exited
+# Concurrent resource operations for apply/destroy (terraform's own default is 10)
+TERRAFORM_PARALLELISM_ARG = f"-parallelism={int(os.getenv('TF_PARALLELISM', '30'))}"
+
+def _pump_terraform_output(stream, command, tail, full=None):
+    """
+    Log each line of a terraform output stream as it arrives, keeping a bounded tail.
+    When `full` is a list the untruncated output is appended to it as well.
+    The stream is always read to EOF: a reader that stopped early would leave
+    terraform blocked on a full pipe.
+    """
+    try:
+        for line in stream:
+            try:
+                if full is not None:
+                    full.append(line)
+                line = line.rstrip('\n')
+                if len(line) > TERRAFORM_LOG_LINE_LIMIT:
+                    line = line[:TERRAFORM_LOG_LINE_LIMIT] + '... [truncated]'
+                logger.info(f"[TERRAFORM {command}] {line}")
+                tail.append(line)
+            except Exception as e:
+                tail.append(f"[output line dropped: {e}]")
+    except Exception as e:
+        logger.warning(f"⚠️ Reading terraform {command} output failed, discarding the rest: {e}")
+        try:
+            while stream.buffer.read(65536):
+                pass
+        except Exception:
+            pass
+    finally:
+        stream.close()
+
+def terraform_env(credentials=None):
+    """
+    Build the environment for a terraform run without mutating os.environ, which is
+    shared by every request thread in the service.
+    """
+    env = dict(TERRAFORM_BASE_ENV)
+    for key, value in (credentials or {}).items():
+        if value:  # Only set non-None values
+            env[key.upper()] = value
     
-    # Ensure Terraform binary is accessible
-    if os.path.exists(terraform_bin_path):
-        logger.info(f"[DEPLOY] Found Terraform binary at: {terraform_bin_path}")
-        # Add the bin directory to PATH
-        bin_dir = os.path.dirname(terraform_bin_path)
-        if bin_dir not in os.environ.get('PATH', ''):
-            os.environ['PATH'] = bin_dir + ':' + os.environ.get('PATH', '')
-            logger.info(f"[DEPLOY] Updated PATH: {os.environ['PATH']}")
-    else:
-        logger.warning(f"[DEPLOY] Terraform binary not found at: {terraform_bin_path}")
-        logger.info(f"[DEPLOY] Falling back to system PATH")
+    # Share downloaded providers across workspaces instead of fetching them per project
+    env.setdefault("TF_PLUGIN_CACHE_DIR", os.path.join(SCRIPT_DIR, ".tf_plugin_cache"))
+    # Without this, terraform only links a cached provider into a workspace whose
+    # .terraform.lock.hcl already lists that provider's checksums, so every fresh workspace
+    # downloads its providers again. With it, new lock files are written from the cached
+    # copy and record just that platform's checksum, i.e. a cached provider is trusted
+    # rather than verified against the registry. Set it to "false" (or "0") to keep full
+    # lock file verification at the cost of a download per new workspace.
+    # Terraform treats any non-empty value as enabled, so an opt-out removes the variable.
+    may_break_lock = env.setdefault("TF_PLUGIN_CACHE_MAY_BREAK_DEPENDENCY_LOCK_FILE", "true")
+    if may_break_lock.strip().lower() in ("", "0", "false", "no"):
+        del env["TF_PLUGIN_CACHE_MAY_BREAK_DEPENDENCY_LOCK_FILE"]
+    os.makedirs(env["TF_PLUGIN_CACHE_DIR"], exist_ok=True)
+    return env
+
+# Terraform's plugin cache is not safe for concurrent use, so `terraform init` runs
+# one at a time: the thread lock covers request threads, the flock other processes
+# (extra uvicorn workers) sharing the same cache directory
+_PLUGIN_CACHE_LOCK = threading.Lock()
+
+@contextlib.contextmanager
+def plugin_cache_locked(env):
+    """Hold the plugin cache for one `terraform init`, across threads and processes"""
+    with _PLUGIN_CACHE_LOCK:
+        if fcntl is None or not env.get("TF_PLUGIN_CACHE_DIR"):
+            yield
+            return
+        with open(os.path.join(env["TF_PLUGIN_CACHE_DIR"], ".init.lock"), "a") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+def run_terraform(workspace_dir, *args, timeout=None, env=None, capture_stdout=False):
+    """
+    Run a terraform CLI command in the workspace and return (return_code, stdout, stderr).
+    Output is streamed to the logger line by line instead of being buffered in full;
+    the returned stdout/stderr hold only the last TERRAFORM_OUTPUT_TAIL_LINES lines,
+    unless capture_stdout is set, in which case stdout is returned complete and
+    untruncated (for commands whose output is parsed, like `output -json`).
+    """
+    process = subprocess.Popen(
+        ["terraform", f"-chdir={workspace_dir}", *args],
+        env=env,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        text=True,
+        errors='replace',  # providers can print non-UTF-8 bytes
+        bufsize=1,
+        start_new_session=True  # own process group, so a timeout can kill provider children too
+    )
+    stdout_tail = deque(maxlen=TERRAFORM_OUTPUT_TAIL_LINES)
+    stderr_tail = deque(maxlen=TERRAFORM_OUTPUT_TAIL_LINES)
+    stdout_full = [] if capture_stdout else None
+    readers = [
+        threading.Thread(target=_pump_terraform_output, args=(process.stdout, args[0], stdout_tail, stdout_full), daemon=True),
+        threading.Thread(target=_pump_terraform_output, args=(process.stderr, args[0], stderr_tail), daemon=True)
+    ]
+    for reader in readers:
+        reader.start()
+    
+    try:
+        return_code = process.wait(timeout=timeout)
+    except subprocess.TimeoutExpired:
+        os.killpg(process.pid, signal.SIGKILL)
+        process.wait()
+        raise
+    finally:
+        # Provider plugins that outlive terraform can hold the pipes open; do not wait on them forever
+        for reader in readers:
+            reader.join(timeout=TERRAFORM_READER_JOIN_TIMEOUT)
+            if reader.is_alive():
+                logger.warning(f"⚠️ terraform {args[0]} output still open {TERRAFORM_READER_JOIN_TIMEOUT}s after exit; not waiting for the rest")
     
-    workspace_dir = os.path.join(os.path.dirname(__file__), "workspace", project_id)
+    stdout = "".join(stdout_full) if capture_stdout else "\n".join(stdout_tail)
+    return return_code, stdout, "\n".join(stderr_tail)
+
+def workspace_path(project_id):
+    """Workspace directory for a project; the id must be a single path component"""
+    if (not project_id or project_id in (".", "..") or os.sep in project_id
+            or (os.altsep and os.altsep in project_id)):
+        raise ValueError(f"Invalid project id: {project_id!r}")
+    return WORKSPACE_ROOT + os.sep + project_id
+
+def _workspace_state(project_id):
+    """
+    Resolve a project's workspace and state file paths with a single stat call.
+    Returns (workspace_dir, state_file, state_stat); state_stat is None when no state file exists.
+    """
+    workspace_dir = workspace_path(project_id)
+    state_file = workspace_dir + os.sep + STATE_FILE_NAME
+    try:
+        state_stat = os.stat(state_file)
+    except FileNotFoundError:
+        state_stat = None
+    return workspace_dir, state_file, state_stat
+
+def is_terraform_initialized(workspace_dir):
+    """
+    Check whether terraform init has already installed providers for this workspace
+    and no *.tf file has changed since, judged by the lock file's mtime.
+    """
+    providers_dir = os.path.join(workspace_dir, ".terraform", "providers")
+    lock_file = os.path.join(workspace_dir, ".terraform.lock.hcl")
+    if not os.path.isdir(providers_dir):
+        return False
+    try:
+        lock_mtime = os.stat(lock_file).st_mtime_ns
+    except FileNotFoundError:
+        return False
+    with os.scandir(workspace_dir) as entries:
+        return all(
+            entry.stat().st_mtime_ns <= lock_mtime
+            for entry in entries
+            if entry.name.endswith(".tf") and entry.is_file()
+        )
+
+def mark_terraform_initialized(workspace_dir):
+    """
+    Touch the lock file after a successful init. Terraform leaves it untouched when
+    the provider selections did not change, which would otherwise force init again.
+    """
+    lock_file = os.path.join(workspace_dir, ".terraform.lock.hcl")
+    if os.path.isfile(lock_file):
+        os.utime(lock_file)
+
+def deploy_terraform(project_id, user_id=None):
+    workspace_dir = workspace_path(project_id)
     logger.info(f"[DEPLOY] Using workspace directory: {workspace_dir}")
-    if not os.path.exists(workspace_dir):
-        os.makedirs(workspace_dir)
-        logger.info(f"[DEPLOY] Created workspace directory: {workspace_dir}")
-    else:
-        logger.info(f"[DEPLOY] Using existing workspace directory: {workspace_dir}")
+    os.makedirs(workspace_dir, exist_ok=True)
     
     try:
         # Create Lambda ZIP files before deployment
@@ -526,46 +946,37 @@ def deploy_terraform(project_id, user_id=None):
             credentials = aws_credential_manager.get_credentials(user_id, project_id)
             logger.info("[DEPLOY] Successfully obtained AWS credentials")
             
-            # Set AWS credentials in environment for Terraform
-            for key, value in credentials.items():
-                if value:  # Only set non-None values
-                    os.environ[key.upper()] = value
+            # Hand AWS credentials to Terraform through its own environment
+            env = terraform_env(credentials)
                     
         except Exception as e:
             logger.error(f"[DEPLOY] Failed to get AWS credentials: {e}")
             return {"status": "error", "logs": str(e), "error": "Failed to get AWS credentials"}
 
-        print("Deploying to AWS region:", os.getenv("AWS_DEFAULT_REGION", os.getenv("AWS_REGION", "us-east-1")))
+        print("Deploying to AWS region:", aws_credential_manager.cfg.region)
         logger.info("[DEPLOY] Using AWS credentials from credential manager")
-        os.environ["TF_LOG"] = "INFO"
         
         # Memory optimization: Clean up any existing state files that are empty
-        state_file = os.path.join(workspace_dir, "terraform.tfstate")
-        if os.path.exists(state_file) and os.stat(state_file).st_size == 0:
+        _, state_file, state_stat = _workspace_state(project_id)
+        if state_stat is not None and state_stat.st_size == 0:
             os.remove(state_file)
             logger.info(f"[DEPLOY] Removed empty state file: {state_file}")
         
-        tf = Terraform(working_dir=workspace_dir)
         logger.info("[DEPLOY] Running terraform init...")
 
-        # Test if terraform binary is accessible
-        try:
-            result = subprocess.run(["terraform", "version"], capture_output=True, text=True, timeout=10)
-            logger.info(f"[DEPLOY] Terraform version check: {result.stdout}")
-            if result.returncode != 0:
-                logger.error(f"[DEPLOY] Terraform version check failed: {result.stderr}")
-        except Exception as e:
-            logger.error(f"[DEPLOY] Terraform binary test failed: {e}")
+        # Test if terraform binary is accessible (runs once per process)
+        _terraform_version()
 
-        init_return_code, init_stdout, init_stderr = tf.init(upgrade=True)
-        
-        # Only log init stderr if there's an error
-        if init_stderr and init_return_code != 0:
-            logger.info(f"[DEPLOY] Init stderr:\n{init_stderr}")
-        
-        if init_return_code != 0:
-            logger.error("[DEPLOY] Terraform init failed")
-            return {"status": "error", "logs": init_stderr, "error": "Terraform init failed"}
+        if is_terraform_initialized(workspace_dir):
+            logger.info("[DEPLOY] Workspace already initialized - skipping terraform init")
+        else:
+            with plugin_cache_locked(env):
+                init_return_code, init_stdout, init_stderr = run_terraform(workspace_dir, "init", "-input=false", "-no-color", env=env)
+            
+            if init_return_code != 0:
+                logger.error("[DEPLOY] Terraform init failed")
+                return {"status": "error", "logs": init_stderr, "error": "Terraform init failed"}
+            mark_terraform_initialized(workspace_dir)
 
         # Force garbage collection after init
         gc.collect()
@@ -575,7 +986,7 @@ def deploy_terraform(project_id, user_id=None):
         if os.path.exists(terraform_file):
             with open(terraform_file, 'r') as f:
                 terraform_config = f.read()
-            import_results = import_existing_resources(project_id, terraform_config)
+            import_results = import_existing_resources(project_id, terraform_config, env)
             # Clean up terraform_config from memory
             del terraform_config
             gc.collect()
@@ -583,31 +994,21 @@ def deploy_terraform(project_id, user_id=None):
             import_results = []
 
         logger.info("[DEPLOY] Running terraform apply...")
-        return_code, stdout, stderr = tf.apply(skip_plan=True, capture_output=True)
-        
-        # Only log stdout if it's short or contains important info
-        if stdout and len(stdout.strip()) < 500:
-            logger.info(f"[DEPLOY] Apply stdout: {stdout.strip()}")
-        elif stdout:
-            logger.info(f"[DEPLOY] Apply stdout: {stdout.strip()[:200]}...")
-        
-        # Only log stderr if there's an error or important warnings
-        if stderr and (return_code != 0 or "error" in stderr.lower() or "warning" in stderr.lower()):
-            logger.info(f"[DEPLOY] Apply stderr:\n{stderr}")
+        return_code, stdout, stderr = run_terraform(workspace_dir, "apply", "-auto-approve", "-input=false", "-no-color", TERRAFORM_PARALLELISM_ARG, env=env)
         
         if return_code == 0:
             logger.info("[DEPLOY] Terraform apply succeeded")
             
             # Get Terraform outputs for status update
             try:
-                outputs_return_code, outputs_stdout, outputs_stderr = tf.output(capture_output=True)
+                outputs_return_code, outputs_stdout, outputs_stderr = run_terraform(
+                    workspace_dir, "output", "-json", "-no-color", env=env, capture_stdout=True
+                )
                 if outputs_return_code == 0:
-                    # Parse outputs (they come as key=value pairs)
-                    deployment_outputs = {}
-                    for line in outputs_stdout.strip().split('\n'):
-                        if '=' in line:
-                            key, value = line.split('=', 1)
-                            deployment_outputs[key.strip()] = value.strip().strip('"')
+                    deployment_outputs = {
+                        key: output_data.get('value')
+                        for key, output_data in orjson.loads(outputs_stdout or "{}").items()
+                    }
                     
                     # Update project deployment status in main backend
                     update_project_deployment_status(project_id, 'deployed', deployment_outputs)
@@ -640,31 +1041,108 @@ def deploy_terraform(project_id, user_id=None):
         # Final garbage collection
         gc.collect()
 
+# Large enough connection pool for the threaded cleanup; adaptive retries absorb throttling.
+# Keepalive and short connect timeouts keep pooled connections healthy between calls.
+AWS_CLIENT_CONFIG = Config(
+    max_pool_connections=64,
+    retries={'mode': 'adaptive', 'max_attempts': 5},
+    tcp_keepalive=True,
+    connect_timeout=3,
+    read_timeout=30
+)
+
+@functools.lru_cache(maxsize=32)
+def _build_aws_clients(aws_access_key_id, aws_secret_access_key, aws_session_token, region_name):
+    """
+    Build the service clients for one set of credentials. Cached on the credentials
+    themselves, so refreshed STS credentials naturally get a fresh set of clients.
+    """
+    session = _boto3().Session(
+        aws_access_key_id=aws_access_key_id,
+        aws_secret_access_key=aws_secret_access_key,
+        aws_session_token=aws_session_token,
+        region_name=region_name
+    )
+    
+    return {
+        's3': session.client('s3', config=AWS_CLIENT_CONFIG),
+        'lambda': session.client('lambda', config=AWS_CLIENT_CONFIG),
+        'apigateway': session.client('apigateway', config=AWS_CLIENT_CONFIG),
+        'apigatewayv2': session.client('apigatewayv2', config=AWS_CLIENT_CONFIG),
+        'dynamodb': session.client('dynamodb', config=AWS_CLIENT_CONFIG),
+        'iam': session.client('iam', config=AWS_CLIENT_CONFIG)
+    }
+
 def get_aws_clients(user_id=None, project_id=None):
     """Initialize AWS clients with proper error handling"""
     try:
         credentials = aws_credential_manager.get_credentials(user_id, project_id)
-        session = boto3.Session(
-            aws_access_key_id=credentials['aws_access_key_id'],
-            aws_secret_access_key=credentials['aws_secret_access_key'],
-            aws_session_token=credentials.get('aws_session_token'),
-            region_name=os.getenv('AWS_DEFAULT_REGION', os.getenv('AWS_REGION', 'us-east-1'))
+        return _build_aws_clients(
+            credentials['aws_access_key_id'],
+            credentials['aws_secret_access_key'],
+            credentials.get('aws_session_token'),
+            aws_credential_manager.cfg.region
         )
-        
-        return {
-            's3': session.client('s3'),
-            'lambda': session.client('lambda'),
-            'apigateway': session.client('apigateway'),
-            'apigatewayv2': session.client('apigatewayv2'),
-            'dynamodb': session.client('dynamodb'),
-            'iam': session.client('iam')
-        }
     except Exception as e:
         logger.warning(f"⚠️ Could not initialize AWS clients: {e}")
         return None
 
-def extract_resources_from_state(state_data):
-    """Extract AWS resource information from Terraform state"""
+def _s3_bucket_record(attributes):
+    name = attributes.get('bucket')
+    if name:
+        return {
+            'name': name,
+            'arn': attributes.get('arn'),
+            'region': attributes.get('region'),
+            'force_destroy': attributes.get('force_destroy', False)
+        }
+
+def _lambda_function_record(attributes):
+    name = attributes.get('function_name')
+    if name:
+        return {
+            'name': name,
+            'arn': attributes.get('arn'),
+            'role': attributes.get('role')
+        }
+
+def _api_gateway_record(gateway_type):
+    def record(attributes):
+        gateway_id = attributes.get('id')
+        if gateway_id:
+            return {
+                'id': gateway_id,
+                'name': attributes.get('name'),
+                'type': gateway_type
+            }
+    return record
+
+def _named_resource_record(attributes):
+    name = attributes.get('name')
+    if name:
+        return {
+            'name': name,
+            'arn': attributes.get('arn')
+        }
+
+# Terraform resource type -> (key in the extracted resources dict, record builder)
+RESOURCE_EXTRACTORS = {
+    'aws_s3_bucket': ('s3_buckets', _s3_bucket_record),
+    'aws_lambda_function': ('lambda_functions', _lambda_function_record),
+    'aws_api_gateway_rest_api': ('api_gateways', _api_gateway_record('v1')),
+    'aws_apigatewayv2_api': ('api_gateways', _api_gateway_record('v2')),
+    'aws_dynamodb_table': ('dynamodb_tables', _named_resource_record),
+    'aws_iam_role': ('iam_roles', _named_resource_record)
+}
+
+_EMPTY = {}  # shared stand-in for instances without attributes; never mutated
+
+def extract_resources_from_state(state_file):
+    """
+    Extract AWS resource information from a Terraform state file.
+    The state is streamed one resource at a time with ijson, so only a
+    single resource is held in memory rather than the whole parsed state.
+    """
     resources = {
         's3_buckets': [],
         'lambda_functions': [],
@@ -673,134 +1151,186 @@ def extract_resources_from_state(state_data):
         'iam_roles': []
     }
     
-    if not state_data or 'resources' not in state_data:
-        return resources
+    # Bind each list's append up front so the per-instance path is a single call
+    extractors = {
+        resource_type: (resources[key].append, build_record)
+        for resource_type, (key, build_record) in RESOURCE_EXTRACTORS.items()
+    }
+    get_extractor = extractors.get
     
-    for resource in state_data['resources']:
-        resource_type = resource.get('type', '')
-        instances = resource.get('instances', [])
-        
-        for instance in instances:
-            attributes = instance.get('attributes', {})
-            
-            if resource_type == 'aws_s3_bucket':
-                bucket_name = attributes.get('bucket')
-                if bucket_name:
-                    resources['s3_buckets'].append({
-                        'name': bucket_name,
-                        'arn': attributes.get('arn'),
-                        'region': attributes.get('region')
-                    })
-            
-            elif resource_type == 'aws_lambda_function':
-                function_name = attributes.get('function_name')
-                if function_name:
-                    resources['lambda_functions'].append({
-                        'name': function_name,
-                        'arn': attributes.get('arn'),
-                        'role': attributes.get('role')
-                    })
-            
-            elif resource_type in ['aws_api_gateway_rest_api', 'aws_apigatewayv2_api']:
-                api_id = attributes.get('id')
-                if api_id:
-                    resources['api_gateways'].append({
-                        'id': api_id,
-                        'name': attributes.get('name'),
-                        'type': 'v1' if resource_type == 'aws_api_gateway_rest_api' else 'v2'
-                    })
-            
-            elif resource_type == 'aws_dynamodb_table':
-                table_name = attributes.get('name')
-                if table_name:
-                    resources['dynamodb_tables'].append({
-                        'name': table_name,
-                        'arn': attributes.get('arn')
-                    })
+    with open(state_file, 'rb') as f:
+        for resource in ijson.items(f, 'resources.item'):
+            extractor = get_extractor(resource.get('type'))
+            if extractor is None:
+                continue
             
-            elif resource_type == 'aws_iam_role':
-                role_name = attributes.get('name')
-                if role_name:
-                    resources['iam_roles'].append({
-                        'name': role_name,
-                        'arn': attributes.get('arn')
-                    })
+            append, build_record = extractor
+            for instance in resource.get('instances') or ():
+                record = build_record(instance.get('attributes') or _EMPTY)
+                if record:
+                    append(record)
     
     return resources
 
-def cleanup_s3_buckets(s3_client, buckets):
-    """Completely empty and prepare S3 buckets for deletion"""
-    cleanup_logs = []
-    
-    for bucket in buckets:
-        bucket_name = bucket['name']
+CLEANUP_MAX_WORKERS = 16
+
+def _run_per_item(func, items):
+    """Run func(item) for each item on a thread pool and flatten the returned log lists in order"""
+    if not items:
+        return []
+    with ThreadPoolExecutor(max_workers=min(CLEANUP_MAX_WORKERS, len(items))) as executor:
+        return [line for logs in executor.map(func, items) for line in logs]
+
+S3_DELETE_BATCH_SIZE = 1000  # DeleteObjects accepts at most 1000 keys per request
+S3_DELETE_MAX_ATTEMPTS = 5
+
+def _chunked(entries, size=S3_DELETE_BATCH_SIZE):
+    """Regroup a stream of delete entries into full DeleteObjects-sized batches"""
+    batch = []
+    for entry in entries:
+        batch.append(entry)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+def _delete_object_batch(s3_client, bucket_name, objects):
+    """Delete one batch of keys, backing off when S3 throttles, and return how many were deleted"""
+    for attempt in range(S3_DELETE_MAX_ATTEMPTS):
         try:
-            logger.info(f"🧹 Cleaning up S3 bucket: {bucket_name}")
-            
-            # Check if bucket exists
+            response = s3_client.delete_objects(
+                Bucket=bucket_name,
+                Delete={'Objects': objects, 'Quiet': True}
+            )
+            break
+        except ClientError as e:
+            error_code = e.response.get('Error', {}).get('Code')
+            status_code = e.response.get('ResponseMetadata', {}).get('HTTPStatusCode')
+            throttled = error_code in ('SlowDown', '503') or status_code == 503
+            if not throttled or attempt == S3_DELETE_MAX_ATTEMPTS - 1:
+                raise
+            time.sleep(0.5 * (2 ** attempt))
+    
+    # Quiet mode only reports the keys that failed
+    errors = response.get('Errors', [])
+    if errors:
+        logger.warning(f"⚠️ {len(errors)} keys could not be deleted from {bucket_name}: {errors[0].get('Message')}")
+    return len(objects) - len(errors)
+
+# DeleteObjects calls in flight across every bucket being cleaned. Buckets are already
+# cleaned CLEANUP_MAX_WORKERS at a time, each also listing; together they have to fit
+# in AWS_CLIENT_CONFIG's 64 pooled connections.
+S3_DELETE_MAX_IN_FLIGHT = 32
+_S3_DELETE_SLOTS = threading.BoundedSemaphore(S3_DELETE_MAX_IN_FLIGHT)
+
+def _delete_batches_in_parallel(s3_client, bucket_name, batches):
+    """Issue delete batches concurrently as the listing produces them and return the total deleted"""
+    futures = []
+    with ThreadPoolExecutor(max_workers=CLEANUP_MAX_WORKERS) as executor:
+        for batch in batches:
+            # Waiting for a free slot before pulling the next page keeps the listing
+            # only a few batches ahead of the deletes instead of queueing all of it
+            _S3_DELETE_SLOTS.acquire()
+            try:
+                future = executor.submit(_delete_object_batch, s3_client, bucket_name, batch)
+            except BaseException:
+                _S3_DELETE_SLOTS.release()
+                raise
+            future.add_done_callback(lambda _: _S3_DELETE_SLOTS.release())
+            futures.append(future)
+    return sum(future.result() for future in futures)
+
+def is_missing_bucket_error(e):
+    """head_bucket has no error body, so a missing bucket is a bare 404 rather than NoSuchBucket"""
+    return isinstance(e, ClientError) and e.response.get('Error', {}).get('Code') in ('404', 'NoSuchBucket')
+
+def _is_versioned_bucket(s3_client, bucket_name):
+    """Return True unless the bucket has never had versioning enabled"""
+    try:
+        status = s3_client.get_bucket_versioning(Bucket=bucket_name).get('Status')
+    except Exception as e:
+        # Assume versioned so the version walk still runs when the status is unknown
+        logger.warning(f"⚠️ Could not read versioning status for {bucket_name}: {e}")
+        return True
+    return status in ('Enabled', 'Suspended')
+
+def _iter_object_keys(s3_client, bucket_name):
+    """Yield a delete entry for every object in the bucket, paging by ContinuationToken"""
+    kwargs = {'Bucket': bucket_name, 'MaxKeys': S3_DELETE_BATCH_SIZE, 'FetchOwner': False}
+    while True:
+        response = s3_client.list_objects_v2(**kwargs)
+        for obj in response.get('Contents', ()):
+            yield {'Key': obj['Key']}
+        if not response.get('IsTruncated'):
+            return
+        kwargs['ContinuationToken'] = response['NextContinuationToken']
+
+def _iter_object_versions(s3_client, bucket_name):
+    """Yield a delete entry for every version and delete marker, paging by key/version markers"""
+    kwargs = {'Bucket': bucket_name, 'MaxKeys': S3_DELETE_BATCH_SIZE}
+    while True:
+        response = s3_client.list_object_versions(**kwargs)
+        for version in response.get('Versions', ()):
+            yield {'Key': version['Key'], 'VersionId': version['VersionId']}
+        for marker in response.get('DeleteMarkers', ()):
+            yield {'Key': marker['Key'], 'VersionId': marker['VersionId']}
+        if not response.get('IsTruncated'):
+            return
+        kwargs['KeyMarker'] = response['NextKeyMarker']
+        kwargs['VersionIdMarker'] = response['NextVersionIdMarker']
+
+def _list_bucket_names(s3_client):
+    """Return the set of bucket names in the account, or None if they cannot be listed"""
+    try:
+        return {b['Name'] for b in s3_client.list_buckets().get('Buckets', [])}
+    except Exception as e:
+        logger.warning(f"⚠️ Could not list buckets, checking each bucket instead: {e}")
+        return None
+
+def _cleanup_one_bucket(s3_client, bucket, existing=None):
+    """Empty a single S3 bucket of objects, versions and delete markers"""
+    cleanup_logs = []
+    bucket_name = bucket['name']
+    try:
+        logger.info(f"🧹 Cleaning up S3 bucket: {bucket_name}")
+        
+        # Check if bucket exists, against the ListBuckets result when there is one
+        if existing is not None and bucket_name not in existing:
+            logger.info(f"✅ Bucket {bucket_name} already deleted")
+            cleanup_logs.append(f"Bucket {bucket_name}: Already deleted")
+            return cleanup_logs
+        if existing is None:
             try:
                 s3_client.head_bucket(Bucket=bucket_name)
-            except s3_client.exceptions.NoSuchBucket:
-                logger.info(f"✅ Bucket {bucket_name} already deleted")
-                cleanup_logs.append(f"Bucket {bucket_name}: Already deleted")
-                continue
             except Exception as e:
+                if is_missing_bucket_error(e):
+                    logger.info(f"✅ Bucket {bucket_name} already deleted")
+                    cleanup_logs.append(f"Bucket {bucket_name}: Already deleted")
+                    return cleanup_logs
                 logger.warning(f"⚠️ Cannot access bucket {bucket_name}: {e}")
                 cleanup_logs.append(f"Bucket {bucket_name}: Access error - {e}")
-                continue
+                return cleanup_logs
+        
+        # Remove all objects
+        try:
+            batches = _chunked(_iter_object_keys(s3_client, bucket_name))
+            objects_deleted = _delete_batches_in_parallel(s3_client, bucket_name, batches)
             
-            # Remove all objects
-            try:
-                paginator = s3_client.get_paginator('list_objects_v2')
-                pages = paginator.paginate(Bucket=bucket_name)
-                
-                objects_deleted = 0
-                for page in pages:
-                    if 'Contents' in page:
-                        objects = [{'Key': obj['Key']} for obj in page['Contents']]
-                        if objects:
-                            s3_client.delete_objects(
-                                Bucket=bucket_name,
-                                Delete={'Objects': objects}
-                            )
-                            objects_deleted += len(objects)
-                
-                if objects_deleted > 0:
-                    logger.info(f"🗑️ Deleted {objects_deleted} objects from {bucket_name}")
-                    cleanup_logs.append(f"Bucket {bucket_name}: Deleted {objects_deleted} objects")
-                
-            except Exception as e:
-                logger.warning(f"⚠️ Error deleting objects from {bucket_name}: {e}")
-                cleanup_logs.append(f"Bucket {bucket_name}: Error deleting objects - {e}")
+            if objects_deleted > 0:
+                logger.info(f"🗑️ Deleted {objects_deleted} objects from {bucket_name}")
+                cleanup_logs.append(f"Bucket {bucket_name}: Deleted {objects_deleted} objects")
             
-            # Remove all object versions and delete markers
+        except Exception as e:
+            logger.warning(f"⚠️ Error deleting objects from {bucket_name}: {e}")
+            cleanup_logs.append(f"Bucket {bucket_name}: Error deleting objects - {e}")
+        
+        # Remove all object versions and delete markers. Unversioned buckets list their
+        # objects again as "null" versions, so the second walk is skipped for them.
+        if _is_versioned_bucket(s3_client, bucket_name):
             try:
-                paginator = s3_client.get_paginator('list_object_versions')
-                pages = paginator.paginate(Bucket=bucket_name)
-                
-                versions_deleted = 0
-                for page in pages:
-                    # Delete versions
-                    if 'Versions' in page:
-                        versions = [{'Key': v['Key'], 'VersionId': v['VersionId']} 
-                                  for v in page['Versions']]
-                        if versions:
-                            s3_client.delete_objects(
-                                Bucket=bucket_name,
-                                Delete={'Objects': versions}
-                            )
-                            versions_deleted += len(versions)
-                    
-                    # Delete delete markers
-                    if 'DeleteMarkers' in page:
-                        markers = [{'Key': m['Key'], 'VersionId': m['VersionId']} 
-                                 for m in page['DeleteMarkers']]
-                        if markers:
-                            s3_client.delete_objects(
-                                Bucket=bucket_name,
-                                Delete={'Objects': markers}
-                            )
-                            versions_deleted += len(markers)
+                batches = _chunked(_iter_object_versions(s3_client, bucket_name))
+                versions_deleted = _delete_batches_in_parallel(s3_client, bucket_name, batches)
                 
                 if versions_deleted > 0:
                     logger.info(f"🗑️ Deleted {versions_deleted} versions/markers from {bucket_name}")
@@ -809,105 +1339,113 @@ def cleanup_s3_buckets(s3_client, buckets):
             except Exception as e:
                 logger.warning(f"⚠️ Error deleting versions from {bucket_name}: {e}")
                 cleanup_logs.append(f"Bucket {bucket_name}: Error deleting versions - {e}")
-            
-            logger.info(f"✅ S3 bucket {bucket_name} cleaned and ready for deletion")
-            cleanup_logs.append(f"Bucket {bucket_name}: Successfully cleaned")
-            
-        except Exception as e:
-            logger.error(f"❌ Failed to clean bucket {bucket_name}: {e}")
-            cleanup_logs.append(f"Bucket {bucket_name}: Cleanup failed - {e}")
+        
+        logger.info(f"✅ S3 bucket {bucket_name} cleaned and ready for deletion")
+        cleanup_logs.append(f"Bucket {bucket_name}: Successfully cleaned")
+        
+    except Exception as e:
+        logger.error(f"❌ Failed to clean bucket {bucket_name}: {e}")
+        cleanup_logs.append(f"Bucket {bucket_name}: Cleanup failed - {e}")
     
     return cleanup_logs
 
-def cleanup_lambda_functions(lambda_client, functions):
-    """Clean up Lambda functions and associated resources"""
+def cleanup_s3_buckets(s3_client, buckets):
+    """Completely empty and prepare S3 buckets for deletion"""
+    # boto3 clients are thread-safe, so buckets are emptied concurrently on one client.
+    # One ListBuckets call replaces a HeadBucket round-trip per bucket.
+    existing = _list_bucket_names(s3_client) if buckets else None
+    return _run_per_item(lambda bucket: _cleanup_one_bucket(s3_client, bucket, existing), buckets)
+
+def _cleanup_one_lambda_function(lambda_client, function):
+    """Remove event source mappings from a single Lambda function"""
     cleanup_logs = []
-    
-    for function in functions:
-        function_name = function['name']
+    function_name = function['name']
+    try:
+        logger.info(f"🔧 Preparing Lambda function for deletion: {function_name}")
+        
+        # Remove event source mappings
         try:
-            logger.info(f"🔧 Preparing Lambda function for deletion: {function_name}")
-            
-            # Remove event source mappings
-            try:
-                mappings = lambda_client.list_event_source_mappings(FunctionName=function_name)
-                for mapping in mappings.get('EventSourceMappings', []):
-                    lambda_client.delete_event_source_mapping(UUID=mapping['UUID'])
-                    logger.info(f"🗑️ Removed event source mapping: {mapping['UUID']}")
-            except Exception as e:
-                logger.warning(f"⚠️ Error removing event source mappings: {e}")
-            
-            cleanup_logs.append(f"Lambda {function_name}: Prepared for deletion")
-            
-        except lambda_client.exceptions.ResourceNotFoundException:
-            logger.info(f"✅ Lambda function {function_name} already deleted")
-            cleanup_logs.append(f"Lambda {function_name}: Already deleted")
+            mappings = lambda_client.list_event_source_mappings(FunctionName=function_name)
+            for mapping in mappings.get('EventSourceMappings', []):
+                lambda_client.delete_event_source_mapping(UUID=mapping['UUID'])
+                logger.info(f"🗑️ Removed event source mapping: {mapping['UUID']}")
         except Exception as e:
-            logger.warning(f"⚠️ Error preparing Lambda {function_name}: {e}")
-            cleanup_logs.append(f"Lambda {function_name}: Preparation warning - {e}")
+            logger.warning(f"⚠️ Error removing event source mappings: {e}")
+        
+        cleanup_logs.append(f"Lambda {function_name}: Prepared for deletion")
+        
+    except lambda_client.exceptions.ResourceNotFoundException:
+        logger.info(f"✅ Lambda function {function_name} already deleted")
+        cleanup_logs.append(f"Lambda {function_name}: Already deleted")
+    except Exception as e:
+        logger.warning(f"⚠️ Error preparing Lambda {function_name}: {e}")
+        cleanup_logs.append(f"Lambda {function_name}: Preparation warning - {e}")
     
     return cleanup_logs
 
-def cleanup_api_gateways(apigateway_client, apigatewayv2_client, gateways):
-    """Clean up API Gateway resources"""
+def cleanup_lambda_functions(lambda_client, functions):
+    """Clean up Lambda functions and associated resources"""
+    return _run_per_item(lambda function: _cleanup_one_lambda_function(lambda_client, function), functions)
+
+def _check_one_api_gateway(apigateway_client, apigatewayv2_client, gateway):
+    """Check whether a single API Gateway still exists ahead of destroy"""
     cleanup_logs = []
+    gateway_id = gateway['id']
+    gateway_type = gateway['type']
     
-    for gateway in gateways:
-        gateway_id = gateway['id']
-        gateway_type = gateway['type']
+    try:
+        logger.info(f"🌐 Preparing API Gateway for deletion: {gateway_id} (type: {gateway_type})")
         
-        try:
-            logger.info(f"🌐 Preparing API Gateway for deletion: {gateway_id} (type: {gateway_type})")
-            
-            client = apigateway_client if gateway_type == 'v1' else apigatewayv2_client
-            
-            if gateway_type == 'v1':
-                try:
-                    client.get_rest_api(restApiId=gateway_id)
-                    cleanup_logs.append(f"API Gateway v1 {gateway_id}: Ready for deletion")
-                except client.exceptions.NotFoundException:
-                    cleanup_logs.append(f"API Gateway v1 {gateway_id}: Already deleted")
-            else:
-                try:
-                    client.get_api(ApiId=gateway_id)
-                    cleanup_logs.append(f"API Gateway v2 {gateway_id}: Ready for deletion")
-                except client.exceptions.NotFoundException:
-                    cleanup_logs.append(f"API Gateway v2 {gateway_id}: Already deleted")
-            
-        except Exception as e:
-            logger.warning(f"⚠️ Error checking API Gateway {gateway_id}: {e}")
-            cleanup_logs.append(f"API Gateway {gateway_id}: Check warning - {e}")
+        client = apigateway_client if gateway_type == 'v1' else apigatewayv2_client
+        
+        if gateway_type == 'v1':
+            try:
+                client.get_rest_api(restApiId=gateway_id)
+                cleanup_logs.append(f"API Gateway v1 {gateway_id}: Ready for deletion")
+            except client.exceptions.NotFoundException:
+                cleanup_logs.append(f"API Gateway v1 {gateway_id}: Already deleted")
+        else:
+            try:
+                client.get_api(ApiId=gateway_id)
+                cleanup_logs.append(f"API Gateway v2 {gateway_id}: Ready for deletion")
+            except client.exceptions.NotFoundException:
+                cleanup_logs.append(f"API Gateway v2 {gateway_id}: Already deleted")
+        
+    except Exception as e:
+        logger.warning(f"⚠️ Error checking API Gateway {gateway_id}: {e}")
+        cleanup_logs.append(f"API Gateway {gateway_id}: Check warning - {e}")
     
     return cleanup_logs
 
+def cleanup_api_gateways(apigateway_client, apigatewayv2_client, gateways, verbose_preflight=False):
+    """
+    Clean up API Gateway resources.
+    API Gateways need no preparation and terraform destroy copes with ones that are
+    already gone, so the per-API existence lookup only runs with verbose_preflight=True.
+    """
+    if not verbose_preflight:
+        return [
+            f"API Gateway {gateway['type']} {gateway['id']}: Ready for deletion"
+            for gateway in gateways
+        ]
+    
+    return _run_per_item(
+        lambda gateway: _check_one_api_gateway(apigateway_client, apigatewayv2_client, gateway),
+        gateways
+    )
+
 def destroy_terraform_with_cleanup(project_id, user_id=None):
     """
     Destroy Terraform infrastructure with comprehensive cleanup.
     This function handles AWS resource cleanup before running terraform destroy.
     """
-    # Find terraform binary location
-    script_dir = os.path.dirname(__file__)
-    terraform_bin_path = os.path.join(script_dir, "..", "bin", "terraform")
-    
-    # Ensure Terraform binary is accessible
-    if os.path.exists(terraform_bin_path):
-        logger.info(f"[DESTROY] Found Terraform binary at: {terraform_bin_path}")
-        # Add the bin directory to PATH
-        bin_dir = os.path.dirname(terraform_bin_path)
-        if bin_dir not in os.environ.get('PATH', ''):
-            os.environ['PATH'] = bin_dir + ':' + os.environ.get('PATH', '')
-            logger.info(f"[DESTROY] Updated PATH: {os.environ['PATH']}")
-    else:
-        logger.warning(f"[DESTROY] Terraform binary not found at: {terraform_bin_path}")
-        logger.info(f"[DESTROY] Falling back to system PATH")
-    
-    workspace_dir = os.path.join(os.path.dirname(__file__), "workspace", project_id)
+    workspace_dir, state_file, state_stat = _workspace_state(project_id)
     logger.info(f"🗑️ [DESTROY] Starting infrastructure destruction for project: {project_id}")
     logger.info(f"🗑️ [DESTROY] Using workspace directory: {workspace_dir}")
     
     cleanup_logs = []
 
-    if not os.path.exists(workspace_dir):
+    if state_stat is None and not os.path.isdir(workspace_dir):
         logger.warning(f"📁 Workspace directory does not exist: {workspace_dir}")
         return {
             "status": "success",
@@ -923,21 +1461,16 @@ def destroy_terraform_with_cleanup(project_id, user_id=None):
         credentials = aws_credential_manager.get_credentials(user_id, project_id)
         logger.info("🔐 [DESTROY] Successfully obtained AWS credentials")
         
-        # Set AWS credentials in environment for Terraform
-        for key, value in credentials.items():
-            if value:  # Only set non-None values
-                os.environ[key.upper()] = value
+        # Hand AWS credentials to Terraform through its own environment
+        env = terraform_env(credentials)
                 
     except Exception as e:
         logger.error(f"[DESTROY] Failed to get AWS credentials: {e}")
         cleanup_logs.append(f"Warning: Could not get AWS credentials - {e}")
-
-    # Enable Terraform debug logs
-    os.environ["TF_LOG"] = "INFO"
+        env = terraform_env()
 
     # Check if state exists
-    state_file = os.path.join(workspace_dir, "terraform.tfstate")
-    if not os.path.exists(state_file) or os.stat(state_file).st_size == 0:
+    if state_stat is None or state_stat.st_size == 0:
         logger.info("📁 No Terraform state found - nothing to destroy")
         return {
             "status": "success",
@@ -950,30 +1483,41 @@ def destroy_terraform_with_cleanup(project_id, user_id=None):
     
     # Step 1: Read Terraform state and extract resources
     try:
-        with open(state_file, 'r') as f:
-            state_data = json.load(f)
-        
-        resources = extract_resources_from_state(state_data)
+        resources = extract_resources_from_state(state_file)
         logger.info(f"📋 Found resources to clean: S3({len(resources['s3_buckets'])}), Lambda({len(resources['lambda_functions'])}), API Gateway({len(resources['api_gateways'])}), DynamoDB({len(resources['dynamodb_tables'])})")
         
         # Step 2: Pre-cleanup AWS resources if clients available
         if aws_clients:
             logger.info("🧹 Starting pre-cleanup of AWS resources...")
             
-            # Clean S3 buckets first (most common failure point)
-            if resources['s3_buckets']:
-                s3_logs = cleanup_s3_buckets(aws_clients['s3'], resources['s3_buckets'])
-                cleanup_logs.extend(s3_logs)
-            
-            # Prepare Lambda functions
-            if resources['lambda_functions']:
-                lambda_logs = cleanup_lambda_functions(aws_clients['lambda'], resources['lambda_functions'])
-                cleanup_logs.extend(lambda_logs)
+            # Clean S3 buckets first (most common failure point); terraform empties
+            # force_destroy buckets itself, so only the others need pre-cleanup
+            buckets_to_clean = [b for b in resources['s3_buckets'] if not b.get('force_destroy')]
+            for bucket in resources['s3_buckets']:
+                if bucket.get('force_destroy'):
+                    cleanup_logs.append(f"Bucket {bucket['name']}: force_destroy set, left to terraform")
             
-            # Prepare API Gateways
-            if resources['api_gateways']:
-                api_logs = cleanup_api_gateways(aws_clients['apigateway'], aws_clients['apigatewayv2'], resources['api_gateways'])
-                cleanup_logs.extend(api_logs)
+            # The S3, Lambda and API Gateway phases touch disjoint services, so they run
+            # side by side; logs are still collected in phase order
+            with ThreadPoolExecutor(max_workers=3) as executor:
+                phases = []
+                if buckets_to_clean:
+                    phases.append(executor.submit(cleanup_s3_buckets, aws_clients['s3'], buckets_to_clean))
+                
+                # Prepare Lambda functions
+                if resources['lambda_functions']:
+                    phases.append(executor.submit(
+                        cleanup_lambda_functions, aws_clients['lambda'], resources['lambda_functions']
+                    ))
+                
+                # Prepare API Gateways
+                if resources['api_gateways']:
+                    phases.append(executor.submit(
+                        cleanup_api_gateways, aws_clients['apigateway'], aws_clients['apigatewayv2'], resources['api_gateways']
+                    ))
+                
+                for phase in phases:
+                    cleanup_logs.extend(phase.result())
             
             logger.info("✅ Pre-cleanup completed")
         else:
@@ -988,42 +1532,24 @@ def destroy_terraform_with_cleanup(project_id, user_id=None):
     logger.info("🗑️ Running terraform destroy...")
     
     try:
-        result = subprocess.run(
-            ["terraform", "destroy", "-auto-approve", "-no-color", "-input=false"],
-            cwd=workspace_dir,
-            capture_output=True,
-            text=True,
-            timeout=600  # 10 minute timeout
+        return_code, stdout, stderr = run_terraform(
+            workspace_dir, "destroy", "-auto-approve", "-no-color", "-input=false", TERRAFORM_PARALLELISM_ARG,
+            timeout=600,  # 10 minute timeout
+            env=env
         )
-        return_code = result.returncode
-        stdout = result.stdout
-        stderr = result.stderr
         
         # If destroy failed, try one more time with refresh
         if return_code != 0 and "BucketNotEmpty" not in stderr:
             logger.info("🔄 First destroy attempt failed, trying with refresh...")
             time.sleep(5)  # Wait a bit
             
-            # Try refresh first
-            subprocess.run(
-                ["terraform", "refresh"],
-                cwd=workspace_dir,
-                capture_output=True,
-                text=True,
-                timeout=300
-            )
-            
-            # Try destroy again
-            result = subprocess.run(
-                ["terraform", "destroy", "-auto-approve", "-no-color", "-input=false"],
-                cwd=workspace_dir,
-                capture_output=True,
-                text=True,
-                timeout=600
+            # Destroy refreshes state as part of its own plan, so a separate
+            # `terraform refresh` run would only reload the state twice
+            return_code, stdout, stderr = run_terraform(
+                workspace_dir, "destroy", "-auto-approve", "-no-color", "-input=false", "-refresh=true", TERRAFORM_PARALLELISM_ARG,
+                timeout=600,
+                env=env
             )
-            return_code = result.returncode
-            stdout = result.stdout
-            stderr = result.stderr
             
             cleanup_logs.append("Performed retry with refresh")
         
@@ -1048,8 +1574,6 @@ def destroy_terraform_with_cleanup(project_id, user_id=None):
         
         # Clean up workspace directory but preserve terraform.tf
         try:
-            import shutil
-            
             # Preserve terraform.tf file for future deployments
             terraform_file = os.path.join(workspace_dir, "terraform.tf")
             preserved_terraform = None
@@ -1060,8 +1584,8 @@ def destroy_terraform_with_cleanup(project_id, user_id=None):
                 logger.info(f"💾 Preserved terraform.tf for future deployments")
                 cleanup_logs.append("Terraform configuration preserved")
             
-            # Remove workspace directory
-            shutil.rmtree(workspace_dir)
+            # Remove workspace directory (deleted in the background after moving it aside)
+            remove_directory_in_background(workspace_dir)
             logger.info(f"🧹 Cleaned up workspace directory: {workspace_dir}")
             cleanup_logs.append("Workspace directory cleaned up")
             
@@ -1090,27 +1614,187 @@ def destroy_terraform_with_cleanup(project_id, user_id=None):
         "cleanup_logs": cleanup_logs
     }
 
+def remove_directory(path):
+    """
+    Recursively delete a directory. On POSIX this shells out to `rm -rf`, which is
+    much faster than shutil.rmtree on .terraform trees with thousands of files.
+    """
+    if os.name == 'posix':
+        result = subprocess.run(["rm", "-rf", path], capture_output=True, text=True, timeout=60)
+        if result.returncode != 0:
+            raise OSError(f"rm -rf {path} exited with {result.returncode}: {result.stderr.strip()}")
+    else:
+        shutil.rmtree(path)
+
+TRASH_PREFIX = ".trash-"
+# Trash directories this process is deleting right now, so a sweep does not start a second rm
+_trash_in_progress = set()
+_TRASH_LOCK = threading.Lock()
+
+def _remove_trash_in_background(trash_path):
+    with _TRASH_LOCK:
+        if trash_path in _trash_in_progress:
+            return
+        _trash_in_progress.add(trash_path)
+    
+    def remove():
+        try:
+            remove_directory(trash_path)
+        except Exception as e:
+            logger.warning(f"⚠️ Background removal of {trash_path} failed: {e}")
+        finally:
+            with _TRASH_LOCK:
+                _trash_in_progress.discard(trash_path)
+    
+    threading.Thread(target=remove, name=f"rm-{os.path.basename(trash_path)}", daemon=True).start()
+
+def sweep_workspace_trash():
+    """
+    Delete trash directories left behind by removals that did not finish, e.g. because
+    the process was restarted mid-delete or rm failed. Runs in the background.
+    """
+    try:
+        entries = list(os.scandir(WORKSPACE_ROOT))
+    except FileNotFoundError:
+        return
+    for entry in entries:
+        if entry.name.startswith(TRASH_PREFIX) and entry.is_dir(follow_symlinks=False):
+            _remove_trash_in_background(entry.path)
+
+def remove_directory_in_background(path):
+    """
+    Move a directory aside and delete it on a daemon thread, so the caller does not
+    wait for large .terraform trees to be unlinked. The original path is free for
+    reuse as soon as this returns. Leftovers from earlier failed removals are retried.
+    """
+    trash_path = os.path.join(os.path.dirname(path), f"{TRASH_PREFIX}{os.path.basename(path)}-{time.time_ns()}")
+    os.rename(path, trash_path)
+    sweep_workspace_trash()
+
 # Keep the original function name for backward compatibility
 def destroy_terraform(project_id, user_id=None):
     """Wrapper function for backward compatibility"""
     return destroy_terraform_with_cleanup(project_id, user_id)
 
-def get_terraform_outputs(project_id):
-    workspace_dir = os.path.join(os.path.dirname(__file__), "workspace", project_id)
+STATE_CACHE_MAX_ENTRIES = 64
+# Raw /state bodies can be megabytes each, so the cache is also capped by total size
+STATE_CACHE_MAX_BYTES = int(os.getenv('STATE_CACHE_MAX_BYTES', str(32 * 1024 * 1024)))
+# state_file -> ((st_mtime_ns, st_size), {view name: value}, cached bytes), least recently used first
+_STATE_CACHE = OrderedDict()
+_STATE_CACHE_LOCK = threading.Lock()
+_state_cache_bytes = 0
+
+def _state_view_size(value):
+    """Approximate memory held by a cached view: its size as JSON"""
+    if isinstance(value, (bytes, str)):
+        return len(value)
+    return len(orjson.dumps(value))
+
+def _stat_version(state_file):
+    try:
+        state_stat = os.stat(state_file)
+    except FileNotFoundError:
+        return None
+    return (state_stat.st_mtime_ns, state_stat.st_size)
+
+def _cached_state_view(state_file, state_stat, name, load):
+    """
+    Return load(state_file), memoized for as long as the state file's mtime and size
+    are unchanged, so repeated polls of an idle project cost only the stat call.
+    """
+    global _state_cache_bytes
+    version = (state_stat.st_mtime_ns, state_stat.st_size)
+    with _STATE_CACHE_LOCK:
+        entry = _STATE_CACHE.get(state_file)
+        if entry is not None and entry[0] == version and name in entry[1]:
+            _STATE_CACHE.move_to_end(state_file)
+            return entry[1][name]
     
-    if not os.path.exists(workspace_dir):
-        logger.warning(f"📁 Workspace directory does not exist: {workspace_dir}")
-        return {
-            "status": "success",
-            "outputs": {},
-            "message": "Workspace does not exist"
-        }
+    value = load(state_file)
+    
+    # If terraform rewrote the file while it was being read, the value may belong to
+    # a newer version than `version`; serve it, but do not cache it under the old key
+    if _stat_version(state_file) != version:
+        return value
+    size = _state_view_size(value)
+    if size > STATE_CACHE_MAX_BYTES:
+        return value
+    
+    with _STATE_CACHE_LOCK:
+        entry = _STATE_CACHE.pop(state_file, None)
+        if entry is not None and entry[0] != version:
+            _state_cache_bytes -= entry[2]
+            entry = None
+        views, cached_bytes = (entry[1], entry[2]) if entry is not None else ({}, 0)
+        if name not in views:  # another thread may have stored it in the meantime
+            views[name] = value
+            cached_bytes += size
+            _state_cache_bytes += size
+        _STATE_CACHE[state_file] = (version, views, cached_bytes)
+        while len(_STATE_CACHE) > STATE_CACHE_MAX_ENTRIES or _state_cache_bytes > STATE_CACHE_MAX_BYTES:
+            _, evicted = _STATE_CACHE.popitem(last=False)
+            _state_cache_bytes -= evicted[2]
+    return value
+
+def _state_etag(state_stat):
+    """Entity tag for a state file version, matching the state cache key"""
+    return f'"{state_stat.st_mtime_ns:x}-{state_stat.st_size:x}"'
 
-    logger.info(f"📊 Getting Terraform outputs for project: {project_id}")
+def _file_contains(f, needle, chunk_size=1024 * 1024):
+    """Search a binary file for needle from its current position, chunk by chunk"""
+    tail = b''
+    while True:
+        chunk = f.read(chunk_size)
+        if not chunk:
+            return False
+        # Keep the end of the previous chunk so a match split across reads is found
+        window = tail + chunk
+        if needle in window:
+            return True
+        tail = window[-(len(needle) - 1):]
 
-    state_file = os.path.join(workspace_dir, "terraform.tfstate")
+def _read_state_outputs(state_file):
+    """Parse only the "outputs" object of a state file into {name: value}"""
+    # Terraform writes "outputs" ahead of "resources", so parsing stops long before
+    # the bulk of the state. The file is read rather than mapped: terraform truncates and
+    # rewrites it in place while persisting state, and a truncated mapping faults with
+    # SIGBUS, whereas a short read is just a parse error.
+    with open(state_file, 'rb') as f:
+        # Without the key ijson would tokenize the whole file before giving up; a byte
+        # search for it is far cheaper, and stops right away when the key is present
+        if not _file_contains(f, b'"outputs"'):
+            return {}
+        f.seek(0)
+        state_outputs = next(ijson.items(f, 'outputs', use_float=True), None) or {}
     
-    if not os.path.exists(state_file) or os.stat(state_file).st_size == 0:
+    return {
+        key: output_data['value']
+        for key, output_data in state_outputs.items()
+        if 'value' in output_data
+    }
+
+def _read_state_raw(state_file):
+    """Read a state file's bytes, checking they look like a JSON object"""
+    with open(state_file, 'rb') as f:
+        if hasattr(os, 'posix_fadvise'):
+            # The whole file is read front to back: widen readahead and start it now
+            os.posix_fadvise(f.fileno(), 0, 0, os.POSIX_FADV_SEQUENTIAL)
+            os.posix_fadvise(f.fileno(), 0, 0, os.POSIX_FADV_WILLNEED)
+        state_raw = f.read()
+    
+    # The state is handed back as raw JSON bytes so it is never parsed and
+    # re-serialized; a cheap shape check stands in for a full parse.
+    stripped = state_raw.strip()
+    if not (stripped.startswith(b'{') and stripped.endswith(b'}')):
+        raise ValueError("State file is not a JSON object")
+    return state_raw
+
+def get_terraform_outputs(project_id):
+    _, state_file, state_stat = _workspace_state(project_id)
+
+    logger.info("📊 Getting Terraform outputs for project: %s", project_id)
+
+    if state_stat is None or state_stat.st_size == 0:
         logger.info("📁 No Terraform state file found")
         return {
             "status": "success",
@@ -1119,24 +1803,17 @@ def get_terraform_outputs(project_id):
         }
 
     try:
-        with open(state_file, 'r') as f:
-            state_data = json.load(f)
+        outputs = _cached_state_view(state_file, state_stat, 'outputs', _read_state_outputs)
         
-        # Extract outputs from state file
-        outputs = {}
-        if 'outputs' in state_data:
-            for key, output_data in state_data['outputs'].items():
-                if 'value' in output_data:
-                    outputs[key] = output_data['value']
-        
-        logger.info(f"✅ Retrieved {len(outputs)} outputs from state file")
+        logger.info("✅ Retrieved %d outputs from state file", len(outputs))
         return {
             "status": "success",
-            "outputs": outputs
+            "outputs": outputs,
+            "etag": _state_etag(state_stat)
         }
             
     except Exception as e:
-        logger.error(f"❌ Exception getting outputs: {str(e)}")
+        logger.error("❌ Exception getting outputs: %s", e)
         return {
             "status": "error",
             "outputs": {},
@@ -1144,19 +1821,9 @@ def get_terraform_outputs(project_id):
         }
 
 def get_terraform_state(project_id):
-    workspace_dir = os.path.join(os.path.dirname(__file__), "workspace", project_id)
-    
-    if not os.path.exists(workspace_dir):
-        logger.warning(f"📁 Workspace directory does not exist: {workspace_dir}")
-        return {
-            "status": "success",
-            "state": {},
-            "message": "Workspace does not exist"
-        }
+    _, state_file, state_stat = _workspace_state(project_id)
 
-    state_file = os.path.join(workspace_dir, "terraform.tfstate")
-    
-    if not os.path.exists(state_file) or os.stat(state_file).st_size == 0:
+    if state_stat is None or state_stat.st_size == 0:
         logger.info("📁 No Terraform state file found")
         return {
             "status": "success",
@@ -1165,17 +1832,17 @@ def get_terraform_state(project_id):
         }
 
     try:
-        with open(state_file, 'r') as f:
-            state_data = json.load(f)
+        state_raw = _cached_state_view(state_file, state_stat, 'raw', _read_state_raw)
         
-        logger.info(f"✅ Retrieved Terraform state for project: {project_id}")
+        logger.info("✅ Retrieved Terraform state for project: %s", project_id)
         return {
             "status": "success",
-            "state": state_data
+            "state_raw": state_raw,
+            "etag": _state_etag(state_stat)
         }
         
     except Exception as e:
-        logger.error(f"❌ Error reading state file: {str(e)}")
+        logger.error("❌ Error reading state file: %s", e)
         return {
             "status": "error",
             "state": {},
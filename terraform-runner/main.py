@@ -1,90 +1,131 @@
+import asyncio
+import atexit
 import logging
 import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
 from fastapi import FastAPI, Request
-from deploy import deploy_terraform, destroy_terraform, get_terraform_outputs, get_terraform_state
+from fastapi.exceptions import RequestValidationError
+from fastapi.responses import JSONResponse, Response
+from pydantic import BaseModel
+from deploy import (
+    deploy_terraform,
+    destroy_terraform,
+    get_terraform_outputs,
+    get_terraform_state,
+    sweep_workspace_trash
+)
 
-app = FastAPI()
+try:
+    import orjson  # noqa: F401 - ORJSONResponse needs it installed
+    from fastapi.responses import ORJSONResponse as DefaultResponse
+except ImportError:
+    DefaultResponse = JSONResponse
+
+# The deploy functions block on terraform subprocesses and file reads, so handlers run
+# them on worker threads to keep the event loop free for /health and other requests
+app = FastAPI(default_response_class=DefaultResponse)
 
 # Setup logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+@app.on_event("startup")
+async def remove_leftover_trash():
+    # Workspaces whose background removal was cut short by a restart
+    sweep_workspace_trash()
+
 @app.get("/health")
 async def health_check():
     return {"status": "healthy", "service": "terraform-runner"}
 
-@app.post("/deploy")
-async def deploy(request: Request):
-    data = await request.json()
-    project_id = data.get("projectId")
-    user_id = data.get("userId")  # Optional for STS assume role
-    logger.info(f"📦 [DEPLOY] Received deploy request for project: {project_id}, user: {user_id}")
+class ProjectReq(BaseModel):
+    projectId: str
+    userId: Optional[str] = None  # Optional for STS assume role
 
-    try:
-        result = deploy_terraform(project_id, user_id)
-        logger.info(f"📝 [DEPLOY] Result: {result['status']}")
-        return result
-    except Exception as e:
-        logger.exception("❌ [DEPLOY] Deployment failed")
-        return {"error": "Terraform failed", "logs": str(e)}
+# State and output reads are quick, so give them their own threads rather than queueing
+# them behind deploys and destroys, which hold a default executor thread for minutes
+_IO_POOL = ThreadPoolExecutor(max_workers=min(32, (os.cpu_count() or 4) * 2), thread_name_prefix="tfio")
+atexit.register(_IO_POOL.shutdown)
 
-@app.post("/destroy")
-async def destroy(request: Request):
-    data = await request.json()
-    project_id = data.get("projectId")
-    user_id = data.get("userId")  # Optional for STS assume role
-    logger.info(f"🗑️ [DESTROY] Received destroy request for project: {project_id}, user: {user_id}")
+def _state_response(result):
+    if "state_raw" in result:
+        # Splice the state file bytes into the response instead of re-encoding them
+        return Response(
+            content=b'{"status":"success","state":' + result["state_raw"] + b'}',
+            media_type="application/json"
+        )
+    return DefaultResponse(result)
 
-    try:
-        result = destroy_terraform(project_id, user_id)
-        logger.info(f"📝 [DESTROY] Result: {result['status']}")
-        return result
-    except Exception as e:
-        logger.exception("❌ [DESTROY] Destruction failed")
-        return {"error": "Terraform destroy failed", "logs": str(e)}
+def _with_etag(render):
+    """Tag a state read's response, or answer 304 when the client already has that version"""
+    def respond(result, request):
+        etag = result.pop("etag", None)
+        if etag is not None and etag in request.headers.get("if-none-match", "").replace(" ", "").split(","):
+            return Response(status_code=304, headers={"ETag": etag})
+        response = render(result)
+        if etag is not None:
+            response.headers["ETag"] = etag
+        return response
+    return respond
 
-@app.post("/outputs")
-async def outputs(request: Request):
-    data = await request.json()
-    project_id = data.get("projectId")
-    user_id = data.get("userId")  # Optional for STS assume role
-    logger.info(f"📊 [OUTPUTS] Received outputs request for project: {project_id}, user: {user_id}")
+# path -> the error message its handler reports, reused for malformed request bodies
+_ROUTE_ERRORS = {}
+
+@app.exception_handler(RequestValidationError)
+async def invalid_project_request(request: Request, exc: RequestValidationError):
+    # Clients check for "error"; keep the shape the project routes have always returned
+    error = _ROUTE_ERRORS.get(request.url.path)
+    if error is None:
+        return DefaultResponse({"detail": exc.errors()}, status_code=422)
+    logs = "; ".join(
+        f"{'.'.join(part for part in err['loc'][1:] if isinstance(part, str)) or 'body'}: {err['msg']}" for err in exc.errors()
+    )
+    logger.warning("❌ Invalid request body for %s: %s", request.url.path, logs)
+    return DefaultResponse({"error": error, "logs": logs})
 
-    try:
-        result = get_terraform_outputs(project_id)
-        logger.info(f"📝 [OUTPUTS] Result: {result['status']}")
-        return result
-    except Exception as e:
-        logger.exception("❌ [OUTPUTS] Getting outputs failed")
-        return {"error": "Failed to get outputs", "logs": str(e)}
+def _project_route(path, tag, emoji, action, run, error, respond=None, executor=None):
+    """Register a POST endpoint that runs a blocking deploy function for one project"""
+    async def handler(req: ProjectReq, request: Request):
+        logger.info("%s [%s] Received %s request for project: %s, user: %s", emoji, tag, action, req.projectId, req.userId)
+        try:
+            result = await asyncio.get_running_loop().run_in_executor(executor, run, req.projectId, req.userId)
+            logger.info("📝 [%s] Result: %s", tag, result['status'])
+            return respond(result, request) if respond else result
+        except Exception as e:
+            logger.exception("❌ [%s] %s", tag, error)
+            return {"error": error, "logs": str(e)}
 
-@app.post("/state")
-async def state(request: Request):
-    data = await request.json()
-    project_id = data.get("projectId")
-    user_id = data.get("userId")  # Optional for STS assume role
-    logger.info(f"📋 [STATE] Received state request for project: {project_id}, user: {user_id}")
+    _ROUTE_ERRORS[path] = error
+    name = path.strip("/")
+    app.post(path, name=name, operation_id=name)(handler)
 
-    try:
-        result = get_terraform_state(project_id)
-        logger.info(f"📝 [STATE] Result: {result['status']}")
-        return result
-    except Exception as e:
-        logger.exception("❌ [STATE] Getting state failed")
-        return {"error": "Failed to get state", "logs": str(e)}
+_project_route("/deploy", "DEPLOY", "📦", "deploy", deploy_terraform, "Terraform failed")
+_project_route("/destroy", "DESTROY", "🗑️", "destroy", destroy_terraform, "Terraform destroy failed")
+_project_route("/outputs", "OUTPUTS", "📊", "outputs",
+               lambda project_id, _: get_terraform_outputs(project_id), "Failed to get outputs",
+               respond=_with_etag(DefaultResponse), executor=_IO_POOL)
+_project_route("/state", "STATE", "📋", "state",
+               lambda project_id, _: get_terraform_state(project_id), "Failed to get state",
+               respond=_with_etag(_state_response), executor=_IO_POOL)
 
 if __name__ == "__main__":
     import uvicorn
     
     # Get port from environment variable (Heroku sets this)
     port = int(os.environ.get("TERRAFORM_PORT", 8000))
+    # Each worker process keeps its own state and credential caches
+    workers = int(os.environ.get("WEB_CONCURRENCY", 1))
     
-    logger.info(f"🚀 Starting Terraform FastAPI service on port {port}")
+    logger.info("🚀 Starting Terraform FastAPI service on port %s", port)
     
-    # Run the server
+    # Run the server. uvicorn picks uvloop and httptools when they are installed
     uvicorn.run(
-        app, 
+        "main:app" if workers > 1 else app,  # multiple workers need an import string
         host="0.0.0.0",  # Bind to all interfaces for Heroku
         port=port,
-        log_level="info"
+        log_level="info",
+        loop="auto",
+        http="auto",
+        workers=workers
     )
@@ -0,0 +1,38 @@
+import os
+import sys
+import tempfile
+
+import pytest
+
+# deploy builds its credential manager at import time; keep it away from ~/.cache
+os.environ.setdefault("STS_CACHE_DIR", tempfile.mkdtemp(prefix="sts-cache-"))
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import deploy  # noqa: E402
+
+
+@pytest.fixture(autouse=True)
+def isolated_workspaces(tmp_path, monkeypatch):
+    """Point workspaces at a temp dir and start every test with an empty state cache"""
+    root = tmp_path / "workspace"
+    root.mkdir()
+    monkeypatch.setattr(deploy, "WORKSPACE_ROOT", str(root))
+    with deploy._STATE_CACHE_LOCK:
+        deploy._STATE_CACHE.clear()
+        deploy._state_cache_bytes = 0
+    yield root
+    with deploy._STATE_CACHE_LOCK:
+        deploy._STATE_CACHE.clear()
+        deploy._state_cache_bytes = 0
+
+
+@pytest.fixture
+def write_state(isolated_workspaces):
+    """Write a project's terraform.tfstate and return its path"""
+    def write(project_id, content):
+        workspace = isolated_workspaces / project_id
+        workspace.mkdir(exist_ok=True)
+        state_file = workspace / deploy.STATE_FILE_NAME
+        state_file.write_bytes(content if isinstance(content, bytes) else content.encode())
+        return str(state_file)
+    return write
@@ -0,0 +1,77 @@
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+
+STATE = {'version': 4, 'outputs': {'api_url': {'value': 'https://example.com'}}, 'resources': []}
+
+
+@pytest.fixture
+def client():
+    return TestClient(main.app)
+
+
+@pytest.mark.parametrize('path, key, expected', [
+    ('/state', 'state', STATE),
+    ('/outputs', 'outputs', {'api_url': 'https://example.com'}),
+])
+def test_conditional_get_of_unchanged_state(client, write_state, path, key, expected):
+    write_state('p', json.dumps(STATE))
+
+    first = client.post(path, json={'projectId': 'p'})
+    assert first.status_code == 200
+    assert first.json() == {'status': 'success', key: expected}
+    etag = first.headers['etag']
+
+    repeat = client.post(path, json={'projectId': 'p'}, headers={'If-None-Match': etag})
+    assert repeat.status_code == 304
+    assert repeat.content == b''
+    assert repeat.headers['etag'] == etag
+
+    listed = client.post(path, json={'projectId': 'p'}, headers={'If-None-Match': f'W/"other", {etag}'})
+    assert listed.status_code == 304
+
+
+def test_changed_state_gets_a_new_etag(client, write_state):
+    state_file = write_state('p', json.dumps(STATE))
+    etag = client.post('/state', json={'projectId': 'p'}).headers['etag']
+
+    with open(state_file, 'a') as f:
+        f.write(' ')
+    response = client.post('/state', json={'projectId': 'p'}, headers={'If-None-Match': etag})
+    assert response.status_code == 200
+    assert response.headers['etag'] != etag
+
+
+def test_missing_state_has_no_etag(client):
+    response = client.post('/outputs', json={'projectId': 'p'}, headers={'If-None-Match': '"x"'})
+    assert response.status_code == 200
+    assert 'etag' not in response.headers
+    assert response.json()['message'] == 'No state file found'
+
+
+@pytest.mark.parametrize('path, error', [
+    ('/deploy', 'Terraform failed'),
+    ('/destroy', 'Terraform destroy failed'),
+    ('/outputs', 'Failed to get outputs'),
+    ('/state', 'Failed to get state'),
+])
+@pytest.mark.parametrize('body', [{}, {'projectId': 5}])
+def test_invalid_bodies_keep_the_error_shape(client, path, error, body):
+    response = client.post(path, json=body)
+    assert response.status_code == 200
+    assert response.json()['error'] == error
+    assert 'projectId' in response.json()['logs']
+
+
+def test_malformed_json_keeps_the_error_shape(client):
+    response = client.post('/state', content=b'{not json', headers={'content-type': 'application/json'})
+    assert response.status_code == 200
+    assert response.json()['error'] == 'Failed to get state'
+
+
+def test_invalid_project_id_is_reported(client):
+    response = client.post('/state', json={'projectId': '../etc'})
+    assert response.json() == {'error': 'Failed to get state', 'logs': "Invalid project id: '../etc'"}
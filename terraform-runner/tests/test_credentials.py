@@ -0,0 +1,125 @@
+import datetime
+import json
+import os
+import time
+
+import pytest
+
+import deploy
+
+
+class FakeSTS:
+    def __init__(self):
+        self.calls = []
+
+    def assume_role(self, **kwargs):
+        self.calls.append(kwargs)
+        return {'Credentials': {
+            'AccessKeyId': f"key-{len(self.calls)}",
+            'SecretAccessKey': 'secret',
+            'SessionToken': 'token',
+            'Expiration': datetime.datetime.now(datetime.timezone.utc) + datetime.timedelta(hours=1)
+        }}
+
+
+def make_config(cache_dir, role_arn='arn:aws:iam::123456789012:role/deployer', external_id='ext-1'):
+    return deploy.AwsConfig(
+        access_key=None, secret_key=None, session_token=None,
+        region='us-east-1', sts_region='us-east-1',
+        role_arn=role_arn, external_id=external_id,
+        node_env='test', sts_duration_seconds=3600, sts_cache_dir=str(cache_dir)
+    )
+
+
+@pytest.fixture
+def managers():
+    created = []
+    def make(cfg):
+        manager = deploy.AWSCredentialManager(cfg)
+        manager.sts_client = FakeSTS()
+        created.append(manager)
+        return manager
+    yield make
+    for manager in created:
+        manager.shutdown()
+
+
+def cache_files(cache_dir):
+    return sorted(name for name in os.listdir(cache_dir) if name.startswith('sts-'))
+
+
+def test_credentials_survive_a_restart_with_the_same_role(tmp_path, managers):
+    first = managers(make_config(tmp_path))
+    issued = first.get_credentials_for_user('u', 'p')
+    assert len(cache_files(tmp_path)) == 1
+
+    second = managers(make_config(tmp_path))
+    assert second.get_credentials_for_user('u', 'p') == issued
+    assert second.sts_client.calls == []
+
+
+def test_cache_files_are_owner_only(tmp_path, managers):
+    managers(make_config(tmp_path / 'c')).get_credentials_for_user('u', 'p')
+    (name,) = cache_files(tmp_path / 'c')
+    assert os.stat(tmp_path / 'c' / name).st_mode & 0o777 == 0o600
+    assert os.stat(tmp_path / 'c').st_mode & 0o777 == 0o700
+
+
+def test_cache_key_depends_on_role_and_external_id(tmp_path):
+    base = deploy.AWSCredentialManager(make_config(tmp_path))
+    other_role = deploy.AWSCredentialManager(make_config(tmp_path, role_arn='arn:aws:iam::123456789012:role/other'))
+    other_external_id = deploy.AWSCredentialManager(make_config(tmp_path, external_id='ext-2'))
+    paths = {m._disk_cache_path('u-p') for m in (base, other_role, other_external_id)}
+    assert len(paths) == 3
+
+
+@pytest.mark.parametrize('changed', [{'role_arn': 'arn:aws:iam::123456789012:role/other'}, {'external_id': 'ext-2'}])
+def test_entries_for_another_role_are_discarded_on_load(tmp_path, managers, changed):
+    managers(make_config(tmp_path)).get_credentials_for_user('u', 'p')
+
+    restarted = managers(make_config(tmp_path, **changed))
+    assert restarted.cached_credentials == {}
+    assert cache_files(tmp_path) == []
+    restarted.get_credentials_for_user('u', 'p')
+    assert len(restarted.sts_client.calls) == 1
+
+
+def test_entries_without_role_fields_are_discarded(tmp_path, managers):
+    # Files written before the role was recorded must not be trusted either
+    manager = managers(make_config(tmp_path))
+    path = manager._disk_cache_path('u-p')
+    with open(path, 'w') as f:
+        json.dump({'cache_key': 'u-p', 'credentials': {'aws_access_key_id': 'old'}, 'expiration': time.time() + 3600}, f)
+
+    assert managers(make_config(tmp_path)).cached_credentials == {}
+    assert not os.path.exists(path)
+
+
+def test_expired_entries_are_removed_on_load(tmp_path, managers):
+    manager = managers(make_config(tmp_path))
+    manager._save_disk_cache('u-p', {'aws_access_key_id': 'old'}, time.time() - 1)
+
+    assert managers(make_config(tmp_path)).cached_credentials == {}
+    assert cache_files(tmp_path) == []
+
+
+def test_expired_memory_entry_is_reassumed(tmp_path, managers):
+    manager = managers(make_config(tmp_path))
+    manager.get_credentials_for_user('u', 'p')
+    manager.cached_credentials['u-p']['expiration'] = time.time() - 1
+
+    assert manager.get_credentials_for_user('u', 'p')['aws_access_key_id'] == 'key-2'
+    assert len(manager.sts_client.calls) == 2
+
+
+def test_reload_purges_the_disk_cache(tmp_path, managers, monkeypatch):
+    manager = managers(make_config(tmp_path))
+    manager.get_credentials_for_user('u', 'p')
+    monkeypatch.setenv('STS_CACHE_DIR', str(tmp_path))
+    monkeypatch.setenv('AWS_ROLE_ARN', 'arn:aws:iam::123456789012:role/other')
+
+    manager.reload()
+
+    assert cache_files(tmp_path) == []
+    assert manager.cached_credentials == {}
+    assert manager.cfg.role_arn == 'arn:aws:iam::123456789012:role/other'
@@ -0,0 +1,73 @@
+import json
+import os
+import stat
+import sys
+
+import pytest
+
+import deploy
+
+BIG_OUTPUTS = {
+    'items': {'value': list(range(600)), 'type': 'list'},
+    'blob': {'value': 'x' * 5000, 'type': 'string'},
+}
+
+FAKE_TERRAFORM = f"""\
+#!{sys.executable}
+import json, sys
+command = sys.argv[2]
+if command == 'output':
+    print(json.dumps({BIG_OUTPUTS!r}, indent=2))
+elif command == 'noisy':
+    for i in range(1000):
+        print('line', i)
+    print('y' * 3000)
+elif command == 'binary':
+    sys.stdout.buffer.write(b'caf\\xe9 \\xff\\n' * 20000)
+    print('done')
+    sys.stderr.write('warned\\n')
+    sys.exit(3)
+"""
+
+
+@pytest.fixture
+def terraform_env(tmp_path):
+    binary = tmp_path / 'bin' / 'terraform'
+    binary.parent.mkdir()
+    binary.write_text(FAKE_TERRAFORM)
+    binary.chmod(binary.stat().st_mode | stat.S_IEXEC)
+    return dict(os.environ, PATH=f"{binary.parent}{os.pathsep}{os.environ['PATH']}")
+
+
+def test_returned_output_is_the_truncated_tail(tmp_path, terraform_env):
+    return_code, stdout, _ = deploy.run_terraform(str(tmp_path), 'noisy', env=terraform_env)
+    lines = stdout.split('\n')
+    assert return_code == 0
+    assert len(lines) == deploy.TERRAFORM_OUTPUT_TAIL_LINES
+    assert lines[-1] == 'y' * deploy.TERRAFORM_LOG_LINE_LIMIT + '... [truncated]'
+    assert lines[0] == f"line {1001 - deploy.TERRAFORM_OUTPUT_TAIL_LINES}"
+
+
+def test_capture_stdout_returns_everything(tmp_path, terraform_env):
+    return_code, stdout, _ = deploy.run_terraform(str(tmp_path), 'output', '-json', env=terraform_env, capture_stdout=True)
+    assert return_code == 0
+    assert json.loads(stdout) == BIG_OUTPUTS
+
+
+def test_non_utf8_output_is_drained(tmp_path, terraform_env):
+    return_code, stdout, stderr = deploy.run_terraform(str(tmp_path), 'binary', env=terraform_env)
+    assert return_code == 3
+    assert stdout.split('\n')[-1] == 'done'
+    assert stderr == 'warned'
+
+
+@pytest.mark.parametrize('setting, expected', [(None, 'true'), ('true', 'true'), ('false', None), ('0', None)])
+def test_plugin_cache_lock_file_mode_can_be_turned_off(tmp_path, monkeypatch, setting, expected):
+    base_env = {'PATH': os.environ['PATH'], 'TF_PLUGIN_CACHE_DIR': str(tmp_path / 'cache')}
+    if setting is not None:
+        base_env['TF_PLUGIN_CACHE_MAY_BREAK_DEPENDENCY_LOCK_FILE'] = setting
+    monkeypatch.setattr(deploy, 'TERRAFORM_BASE_ENV', base_env)
+
+    env = deploy.terraform_env({'aws_access_key_id': 'key'})
+    assert env.get('TF_PLUGIN_CACHE_MAY_BREAK_DEPENDENCY_LOCK_FILE') == expected
+    assert env['AWS_ACCESS_KEY_ID'] == 'key'
@@ -0,0 +1,80 @@
+import threading
+import time
+
+import pytest
+from botocore.exceptions import ClientError
+
+import deploy
+
+
+def client_error(code, operation='HeadBucket'):
+    return ClientError({'Error': {'Code': code, 'Message': 'x'}}, operation)
+
+
+@pytest.mark.parametrize('error, missing', [
+    (client_error('404'), True),
+    (client_error('NoSuchBucket'), True),
+    (client_error('403'), False),
+    (client_error('SlowDown'), False),
+    (ValueError('404'), False),
+])
+def test_is_missing_bucket_error(error, missing):
+    assert deploy.is_missing_bucket_error(error) is missing
+
+
+class HeadOnlyS3:
+    def __init__(self, error):
+        self.error = error
+
+    def head_bucket(self, Bucket):
+        raise self.error
+
+
+def test_bucket_that_is_already_gone_is_not_a_failure():
+    logs = deploy._cleanup_one_bucket(HeadOnlyS3(client_error('404')), {'name': 'gone'})
+    assert logs == ['Bucket gone: Already deleted']
+
+
+def test_inaccessible_bucket_is_reported():
+    logs = deploy._cleanup_one_bucket(HeadOnlyS3(client_error('403')), {'name': 'private'})
+    assert len(logs) == 1 and logs[0].startswith('Bucket private: Access error')
+
+
+class SlowDeleteS3:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.in_flight = 0
+        self.peak = 0
+        self.deleted = 0
+
+    def delete_objects(self, Bucket, Delete):
+        with self.lock:
+            self.in_flight += 1
+            self.peak = max(self.peak, self.in_flight)
+        time.sleep(0.005)
+        with self.lock:
+            self.in_flight -= 1
+            self.deleted += len(Delete['Objects'])
+        return {}
+
+
+def test_delete_batches_are_bounded_and_counted(monkeypatch):
+    monkeypatch.setattr(deploy, '_S3_DELETE_SLOTS', threading.BoundedSemaphore(4))
+    s3 = SlowDeleteS3()
+    produced = []
+
+    def batches():
+        for i in range(40):
+            produced.append(i)
+            # The listing may only run a bounded number of batches ahead of the deletes
+            assert len(produced) * 10 - s3.deleted <= (4 + 1) * 10
+            yield [{'Key': f"{i}-{j}"} for j in range(10)]
+
+    assert deploy._delete_batches_in_parallel(s3, 'bucket', batches()) == 400
+    assert s3.peak <= 4
+    assert deploy._S3_DELETE_SLOTS._value == 4
+
+
+def test_chunked_regroups_into_full_batches():
+    sizes = [len(batch) for batch in deploy._chunked(({'Key': str(i)} for i in range(2500)))]
+    assert sizes == [1000, 1000, 500]
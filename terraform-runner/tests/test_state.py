@@ -0,0 +1,134 @@
+import io
+import json
+import os
+
+import pytest
+
+import deploy
+
+STATE = {
+    'version': 4,
+    'outputs': {
+        'api_url': {'value': 'https://example.com', 'type': 'string'},
+        'count': {'value': 3, 'type': 'number'},
+    },
+    'resources': [],
+}
+
+
+def bump_mtime(path):
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+
+
+def test_outputs_are_projected_to_values(write_state):
+    write_state('p', json.dumps(STATE))
+    result = deploy.get_terraform_outputs('p')
+    assert result['status'] == 'success'
+    assert result['outputs'] == {'api_url': 'https://example.com', 'count': 3}
+
+
+def test_state_without_outputs_key(write_state):
+    write_state('p', json.dumps({'version': 4, 'resources': []}))
+    assert deploy.get_terraform_outputs('p')['outputs'] == {}
+
+
+@pytest.mark.parametrize('content', [None, ''])
+def test_missing_or_empty_state(write_state, content):
+    if content is not None:
+        write_state('p', content)
+    assert deploy.get_terraform_outputs('p') == {'status': 'success', 'outputs': {}, 'message': 'No state file found'}
+    assert deploy.get_terraform_state('p') == {'status': 'success', 'state': {}, 'message': 'No state file found'}
+
+
+def test_truncated_state_is_an_error_not_a_crash(write_state):
+    write_state('p', '{"version": 4, "outputs": {"a": {"value": ')
+    result = deploy.get_terraform_outputs('p')
+    assert result['status'] == 'error'
+    assert 'etag' not in result
+
+
+def test_raw_state_is_returned_as_bytes(write_state):
+    raw = json.dumps(STATE).encode()
+    write_state('p', raw)
+    result = deploy.get_terraform_state('p')
+    assert result['state_raw'] == raw
+    assert result['etag'] == deploy.get_terraform_outputs('p')['etag']
+
+
+@pytest.mark.parametrize('project_id', ['', '.', '..', 'a/b', '../x'])
+def test_project_ids_must_be_a_single_path_component(project_id):
+    with pytest.raises(ValueError):
+        deploy.workspace_path(project_id)
+
+
+@pytest.mark.parametrize('chunk_size', range(1, 24))
+def test_file_contains_finds_matches_across_chunk_boundaries(chunk_size):
+    needle = b'"outputs"'
+    assert deploy._file_contains(io.BytesIO(b'{"version":4,"outputs":{}}'), needle, chunk_size)
+    assert not deploy._file_contains(io.BytesIO(b'"outputx" "output" outputs'), needle, chunk_size)
+
+
+class CountingLoader:
+    def __init__(self, load):
+        self.load = load
+        self.calls = 0
+
+    def __call__(self, state_file):
+        self.calls += 1
+        return self.load(state_file)
+
+
+def cached_raw(state_file, loader):
+    return deploy._cached_state_view(state_file, os.stat(state_file), 'raw', loader)
+
+
+def test_state_cache_hits_until_the_file_changes(write_state):
+    state_file = write_state('p', '{"a": 1}')
+    loader = CountingLoader(deploy._read_state_raw)
+
+    assert cached_raw(state_file, loader) == b'{"a": 1}'
+    assert cached_raw(state_file, loader) == b'{"a": 1}'
+    assert loader.calls == 1
+
+    # Same size, newer mtime
+    write_state('p', '{"a": 2}')
+    bump_mtime(state_file)
+    assert cached_raw(state_file, loader) == b'{"a": 2}'
+    assert loader.calls == 2
+
+
+def test_state_cache_skips_values_read_during_a_rewrite(write_state):
+    state_file = write_state('p', '{"a": 1}')
+
+    def racing_read(path):
+        value = deploy._read_state_raw(path)
+        with open(path, 'w') as f:
+            f.write('{"a": 22}')
+        return value
+
+    stale_stat = os.stat(state_file)
+    assert deploy._cached_state_view(state_file, stale_stat, 'raw', racing_read) == b'{"a": 1}'
+    assert deploy._STATE_CACHE == {}
+    assert deploy.get_terraform_state('p')['state_raw'] == b'{"a": 22}'
+
+
+def test_state_cache_is_bounded_by_total_bytes(write_state, monkeypatch):
+    monkeypatch.setattr(deploy, 'STATE_CACHE_MAX_BYTES', 2500)
+    body = '{"pad": "%s"}' % ('x' * 990)
+    for i in range(5):
+        write_state(f"p{i}", body)
+        deploy.get_terraform_state(f"p{i}")
+
+    assert deploy._state_cache_bytes <= 2500
+    assert deploy._state_cache_bytes == sum(entry[2] for entry in deploy._STATE_CACHE.values())
+    # Least recently used projects are the ones evicted
+    assert [os.path.basename(os.path.dirname(path)) for path in deploy._STATE_CACHE] == ['p3', 'p4']
+
+
+def test_values_larger_than_the_budget_are_not_cached(write_state, monkeypatch):
+    monkeypatch.setattr(deploy, 'STATE_CACHE_MAX_BYTES', 100)
+    write_state('p', '{"pad": "%s"}' % ('x' * 200))
+    assert deploy.get_terraform_state('p')['status'] == 'success'
+    assert deploy._STATE_CACHE == {}
+    assert deploy._state_cache_bytes == 0